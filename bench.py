@@ -0,0 +1,359 @@
+"""Micro-benchmarks for the per-frame hot paths in main.py.
+
+Every benchmark is seeded and drawn onto an offscreen surface, so runs are
+comparable between commits:
+
+    python bench.py                        run everything
+    python bench.py -k enemy               only benchmarks whose name contains 'enemy'
+    python bench.py --save baseline.json   also store the results as a baseline
+    python bench.py --compare baseline.json
+    python bench.py --memory               bytes per entity of each kind
+"""
+import os
+import sys
+import json
+import time
+import math
+import argparse
+import functools
+import itertools
+import statistics
+import tracemalloc
+
+# never open a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+import main as game
+
+SEED = 1234
+BENCHMARKS = []
+
+def bench(name, sizes, fresh=False):
+    # register a setup function: setup(n) prepares state and returns the callable to time;
+    # fresh benchmarks change the scene as they run, so setup is redone (untimed) before every call
+    def register(setup):
+        BENCHMARKS.append((name, sizes, setup, fresh))
+        return setup
+    return register
+
+def reset_state(swarm=False, worker=False):
+    game.load_sprites()
+    game.random.seed(SEED)
+    game.SETTINGS['swarm'] = swarm
+    game.SETTINGS['swarm_worker'] = worker
+    game.SETTINGS['ai_budget'] = 0
+    game.ai_lod.reset()
+    game.swarm_mode = swarm
+    game.swarm.clear()
+    game.enemies.clear()
+    game.bullets.clear()
+    game.pickups.clear()
+    game.particles.clear()
+    game.popups.clear()
+    game.player.x, game.player.y = game.WORLD_WIDTH / 2, game.WORLD_HEIGHT / 2
+    game.player.prev_x, game.player.prev_y = game.player.x, game.player.y
+    game.player.hp = game.player.max_hp
+    game.game_zoom = 1.0
+    game.camera_x = game.player.x - game.window_res[0] / 2
+    game.camera_y = game.player.y - game.window_res[1] / 2
+    # keep the shield up so contacts push enemies away instead of thinning the swarm between calls
+    game.sim_time = 0.0
+    game.shield_end_time = math.inf
+    if game.flow_field.blocked.any():
+        game.flow_field.set_blocked(game.np.zeros_like(game.flow_field.blocked))
+    game.display = pygame.Surface(game.window_res)
+
+@bench('enemy_update', (50, 500, 5000), fresh=True)
+def setup_enemy_update(n):
+    reset_state()
+    game.spawn_enemies(n)
+    return game.update_enemies
+
+@bench('enemy_update_spread', (300, 1000, 0), fresh=True)
+def setup_enemy_update_spread(budget):
+    # 5000 enemies over the whole world, most of them in the reduced-rate tiers; sized by AI budget
+    reset_state()
+    game.SETTINGS['ai_budget'] = budget
+    for i in range(5000):
+        game.enemies.append(game.Enemy(game.random.uniform(0, game.WORLD_WIDTH), game.random.uniform(0, game.WORLD_HEIGHT), 1.2))
+    return game.update_enemies
+
+@bench('swarm_step', (50, 500, 5000), fresh=True)
+def setup_swarm_step(n):
+    reset_state(swarm=True)
+    game.spawn_enemies(n)
+    return game.update_enemies
+
+@bench('swarm_worker_step', (50, 500, 5000), fresh=True)
+def setup_swarm_worker_step(n):
+    # same as swarm_step with the step done by the worker process: measures the per-tick round trip
+    reset_state(swarm=True, worker=True)
+    game.spawn_enemies(n)
+    return game.update_enemies
+
+@bench('bullet_collide', (50, 500, 5000))
+def setup_bullet_collide(n):
+    # 20 fast bullets crossing the swarm; hits are only looked up, never applied
+    reset_state()
+    game.spawn_enemies(n)
+    game.enemy_grid.rebuild(game.enemies)
+    rows = []
+    for i in range(20):
+        ang = 2 * math.pi * i / 20
+        handle = game.spawn_bullet(game.player.x + math.cos(ang) * 300, game.player.y + math.sin(ang) * 300, (-math.cos(ang), -math.sin(ang)))
+        game.bullets.x[i] += game.bullets.dx[i] * 30
+        game.bullets.y[i] += game.bullets.dy[i] * 30
+        rows.append(game.bullets.row(handle))
+    def run():
+        for b in rows:
+            game.bullet_first_hit(b)
+    return run
+
+@bench('make_particles', (20, 200, 2000))
+def setup_make_particles(n):
+    reset_state()
+    def run():
+        game.particles.clear()
+        game.make_particles(game.player.x, game.player.y, game.coral, n=n)
+    return run
+
+@bench('particle_step', (500, 5000, 16000))
+def setup_particle_step(n):
+    reset_state()
+    for i in range(n):
+        ang = game.random.uniform(0, 2 * math.pi)
+        game.particles.spawn(game.player.x, game.player.y, math.cos(ang), math.sin(ang), 10 ** 9, game.coral, 3)
+    return game.particles.step
+
+@bench('draw_particles', (500, 5000, 16000))
+def setup_draw_particles(n):
+    # n long-lived particles scattered over the screen around the player, glow on
+    reset_state()
+    colors = [game.coral, game.biolum, game.ocean_accent, game.foam]
+    for i in range(n):
+        ang = game.random.uniform(0, 2 * math.pi)
+        dist = game.random.uniform(0, 350)
+        game.particles.spawn(game.player.x + math.cos(ang) * dist, game.player.y + math.sin(ang) * dist,
+                             0.0, 0.0, 10 ** 9, colors[i % 4], game.random.uniform(1, 4))
+    game.culler.begin()
+    return game.draw_particles
+
+@bench('draw_particles_burst', (20, 100, 500))
+def setup_draw_particles_burst(n):
+    # n particles from bursts of 20 a little way into their life, as hits and kills leave them
+    reset_state()
+    colors = [game.coral, game.biolum, game.ocean_accent, game.foam]
+    for i in range(0, n, 20):
+        game.make_particles(game.player.x + (i * 37 % 600) - 300, game.player.y + (i * 53 % 360) - 180, colors[i // 20 % 4], n=min(20, n - i))
+    for _ in range(8):
+        game.particles.step()
+    game.culler.begin()
+    return game.draw_particles
+
+@bench('draw_tiles', (0.5, 1.0, 2.0))
+def setup_draw_tiles(zoom):
+    reset_state()
+    game.game_zoom = zoom
+    game.draw_tiles()
+    return game.draw_tiles
+
+@bench('draw_glow', (6, 20, 80))
+def setup_draw_glow(radius):
+    # 100 glows across a handful of colours and intensities, as particles produce
+    reset_state()
+    colors = [game.coral, game.biolum, game.ocean_accent, game.foam]
+    calls = [((i * 37 % 800, i * 53 % 480), radius, colors[i % 4], 0.02 * (i % 8)) for i in range(100)]
+    def run():
+        for pos, r, color, intensity in calls:
+            game.draw_glow(pos, r, color, intensity)
+    return run
+
+@bench('draw_entities', (500, 5000))
+def setup_draw_entities(n):
+    # enemies spread over the whole world at zoom 2, where most of them are off-screen
+    reset_state()
+    game.game_zoom = 2.0
+    game.update_camera(game.player.x, game.player.y)
+    for i in range(n):
+        e = game.Enemy(game.random.uniform(0, game.WORLD_WIDTH), game.random.uniform(0, game.WORLD_HEIGHT), 1.2)
+        e.sprite = game.enemy_sprites[0] if game.enemy_sprites else None
+        game.enemies.append(e)
+    def run():
+        game.culler.begin()
+        game.draw_entities(1.0)
+    return run
+
+@bench('minimap', (50, 500, 5000))
+def setup_minimap(n):
+    reset_state()
+    game.spawn_enemies(n)
+    return game.minimap.refresh
+
+@bench('flow_field', (50, 500, 5000))
+def setup_flow_field(n):
+    # the player crossing into a new tile every call: one field build plus sampling it for n enemies
+    reset_state()
+    rng = game.np.random.default_rng(SEED)
+    xs = rng.uniform(0, game.WORLD_WIDTH, n)
+    ys = rng.uniform(0, game.WORLD_HEIGHT, n)
+    def run():
+        game.flow_field.fields.clear()
+        game.flow_field.current = None
+        game.flow_field.chase(xs, ys, game.player.x, game.player.y)
+    return run
+
+@bench('flow_field_walk', (0.0, 0.1, 0.25))
+def setup_flow_field_walk(walls):
+    # the player walking a loop of tiles, longer than the field cache, on a map with this fraction of
+    # wall tiles: one field update from the previous tile per call
+    reset_state()
+    ff = game.flow_field
+    rng = game.np.random.default_rng(SEED)
+    blocked = rng.random((ff.cols, ff.rows)) < walls
+    c0, r0 = ff.cols // 2 - 5, ff.rows // 2 - 3
+    loop = ([(c0 + i, r0) for i in range(10)] + [(c0 + 10, r0 + i) for i in range(6)] +
+            [(c0 + 10 - i, r0 + 6) for i in range(10)] + [(c0, r0 + 6 - i) for i in range(6)])
+    for c, r in loop:
+        blocked[c, r] = False
+    ff.set_blocked(blocked)
+    step = itertools.count()
+    def run():
+        c, r = loop[next(step) % len(loop)]
+        ff.field((c + 0.5) * ff.tile, (r + 0.5) * ff.tile)
+    return run
+
+@bench('snapshot', (50, 500, 5000))
+def setup_snapshot(n):
+    # save and restore a game with n enemies and a screenful of particles
+    reset_state()
+    game.spawn_enemies(n)
+    for i in range(20):
+        game.make_particles(game.player.x, game.player.y, game.coral, n=50)
+    return lambda: game.restore_state(game.snapshot_state())
+
+@bench('spawn_enemies', (50, 500, 5000))
+def setup_spawn_enemies(n):
+    reset_state()
+    return lambda: game.spawn_enemies(n)
+
+@bench('pickups', (50, 500, 5000))
+def setup_pickups(n):
+    # pickups scattered outside the magnet radius with a ttl that never runs out
+    reset_state()
+    for i in range(n):
+        ang = game.random.uniform(0, 2 * math.pi)
+        dist = game.random.uniform(game.MAGNET_RADIUS + 20, 900)
+        game.spawn_pickup(game.player.x + math.cos(ang) * dist, game.player.y + math.sin(ang) * dist, 'coin')
+        game.pickups.ttl[-1] = 10 ** 9
+    return game.update_pickups
+
+def entity_memory(n=5000):
+    # bytes traced per entity while spawning n of each kind, as the game would spawn them
+    reset_state()
+    kinds = {
+        'bullet': lambda i: game.spawn_bullet(i * 1.5, i * 2.5, (math.cos(i), math.sin(i))),
+        'enemy': lambda i: game.enemies.append(game.Enemy(i * 1.5, i * 2.5, 1.2)),
+        'swarm enemy': lambda i: game.swarm.add(i * 1.5, i * 2.5, 1.2),
+        'pickup': lambda i: game.spawn_pickup(i * 1.5, i * 2.5, 'coin'),
+        'popup': lambda i: game.spawn_popup('+10', i * 1.5, i * 2.5),
+    }
+    sizes = {}
+    for name, spawn in kinds.items():
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        for i in range(n):
+            spawn(i)
+        sizes[name] = (tracemalloc.get_traced_memory()[0] - start) / n
+        tracemalloc.stop()
+    # the particle pool is allocated up front, so spawning traces nothing: charge each slot its share instead
+    pool = game.particles
+    sizes['particle'] = sum(col.nbytes for col in vars(pool).values() if isinstance(col, game.np.ndarray)) / pool.capacity
+    reset_state()
+    return sizes
+
+def time_calls(setup, fn, number, fresh):
+    # seconds spent in number calls; fresh calls each start from a new setup() and only the call is timed
+    if not fresh:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+    elapsed = 0.0
+    for _ in range(number):
+        fn = setup()
+        start = time.perf_counter()
+        fn()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+def measure(setup, repeat, min_time, fresh=False):
+    # calibrate calls per sample so each sample lasts at least min_time, then take repeat samples
+    fn = setup()
+    fn()
+    number = 1
+    while True:
+        elapsed = time_calls(setup, fn, number, fresh)
+        if elapsed >= min_time or number >= 1 << 16:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        samples.append(time_calls(setup, fn, number, fresh) / number)
+    return {
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'calls': number,
+    }
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.3f} ms"
+    return f"{seconds * 1e6:8.1f} us"
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the per-frame hot paths of main.py')
+    parser.add_argument('-k', dest='filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=7, help='samples per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per sample')
+    parser.add_argument('--save', metavar='FILE', help='write results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='FILE', help='compare against a saved baseline')
+    parser.add_argument('--memory', action='store_true', help='report bytes per entity instead of timings')
+    args = parser.parse_args()
+
+    if args.memory:
+        for name, size in entity_memory().items():
+            print(f"{name:<24} {size:8.1f} bytes/entity")
+        return
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    for name, sizes, setup, fresh in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        for n in sizes:
+            key = f"{name}[{n}]"
+            stats = measure(functools.partial(setup, n), args.repeat, args.min_time, fresh)
+            results[key] = stats
+            line = f"{key:<24} {format_time(stats['mean'])} +- {format_time(stats['stdev'])}  (min {format_time(stats['min']).strip()})"
+            base = baseline.get(key)
+            if base:
+                change = (stats['mean'] - base['mean']) / base['mean'] * 100
+                line += f"  {change:+7.1f}% vs baseline"
+            print(line)
+            sys.stdout.flush()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'seed': SEED, 'python': sys.version.split()[0], 'pygame': pygame.version.ver,
+                       'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,80 @@
+import time
+STARTUP_T0 = time.perf_counter()
 import pygame
 import sys
 import random
-import time
 import math
 import os
+import glob
+import json
+import hashlib
+import struct
+import zlib
+import array
+import argparse
+import subprocess
+import atexit
+import queue
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from collections import OrderedDict
+import numpy as np
+
+class StartupTimeline:
+    """Time spent in each startup phase, and when the first frame was presented and the assets ready, from the top of main.py"""
+    PHASES = ('import', 'init', 'display', 'fonts', 'assets')
+
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.durations = {}
+        self.first_frame = None
+        self.loaded = None
+
+    def add(self, phase, seconds):
+        # phases that happen lazily, possibly in several pieces, accumulate
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def mark(self, phase):
+        # sequential phase: everything since the previous mark
+        now = time.perf_counter()
+        self.add(phase, now - self.last)
+        self.last = now
+
+    def frame_presented(self):
+        # True only for the first frame
+        if self.first_frame is not None:
+            return False
+        self.first_frame = time.perf_counter() - self.start
+        return True
+
+    def report(self):
+        lines = ["startup timeline (ms):"]
+        for phase in self.PHASES:
+            if phase in self.durations:
+                lines.append(f"  {phase:<12}{self.durations[phase] * 1000:8.1f}")
+            else:
+                lines.append(f"  {phase:<12}deferred")
+        if self.first_frame is not None:
+            lines.append(f"  {'first frame':<12}{self.first_frame * 1000:8.1f}  (since start)")
+        if self.loaded is not None:
+            lines.append(f"  {'loaded':<12}{self.loaded * 1000:8.1f}  (since start)")
+        return '\n'.join(lines)
+
+startup = StartupTimeline(STARTUP_T0)
+startup.mark('import')
 
-pygame.init()
+# headless runs (python main.py --headless) and worker processes never open a real window
+HEADLESS = '--headless' in sys.argv or '--check-replay' in sys.argv or multiprocessing.parent_process() is not None
+if HEADLESS:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# only what the game uses: no mixer or joystick, which can be slow to bring up
+pygame.display.init()
+pygame.font.init()
+startup.mark('init')
 
 window_res = (800, 480)
 window_title = "One In The Chamber"
@@ -13,6 +82,7 @@ window_title = "One In The Chamber"
 display = pygame.display.set_mode(window_res)
 pygame.display.set_caption(window_title)
 pygame.display.set_icon(pygame.Surface((1, 1)))  # placeholder blank icon
+startup.mark('display')
 
 # window state
 is_maximized = False
@@ -30,9 +100,126 @@ WORLD_WIDTH = 3200
 WORLD_HEIGHT = 1920
 TILE_SIZE = 64
 
+class AssetEntry:
+    """One named asset in an AssetLoader and how far it has got"""
+    def __init__(self, prepare, finish):
+        self.prepare = prepare  # any thread: read, decode, generate
+        self.finish = finish  # main thread only: display-format conversion; None when there is none
+        self.state = 'queued'  # queued -> preparing -> prepared -> ready
+        self.prepared = threading.Event()
+        self.result = None
+        self.error = None
+
+class AssetLoader:
+    """Prepares assets on a worker thread, each exactly once; the main thread only runs their finishing step"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.jobs = queue.Queue()
+        self.thread = None
+
+    def request(self, name, prepare, finish=None):
+        # queue an asset for the worker; asking again for a known name returns the first request
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                entry = self.entries[name] = AssetEntry(prepare, finish)
+                self.jobs.put(name)
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.work, name='asset-loader', daemon=True)
+                    self.thread.start()
+            return entry
+
+    def work(self):
+        while True:
+            entry = self.entries[self.jobs.get()]
+            if self.claim(entry):
+                self.run(entry)
+
+    def claim(self, entry):
+        # whoever gets to a queued entry first prepares it; everyone else waits for that
+        with self.lock:
+            if entry.state != 'queued':
+                return False
+            entry.state = 'preparing'
+            return True
+
+    def run(self, entry):
+        try:
+            entry.result = entry.prepare()
+        except Exception as exc:
+            entry.error = exc
+        entry.state = 'prepared'
+        entry.prepared.set()
+
+    def complete(self, entry):
+        # main thread: the display-format step, once
+        if entry.state == 'prepared':
+            if entry.error is None and entry.finish is not None:
+                try:
+                    entry.result = entry.finish(entry.result)
+                except Exception as exc:
+                    entry.error = exc
+            entry.state = 'ready'
+
+    def get(self, name, prepare, finish=None):
+        """The finished asset, blocking until it is; prepared right here if the worker hasn't started on it"""
+        entry = self.request(name, prepare, finish)
+        if self.claim(entry):
+            self.run(entry)
+        entry.prepared.wait()
+        self.complete(entry)
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
+
+    def pump(self, budget=0.004):
+        # main thread, once a frame: finish prepared assets for up to budget seconds
+        started = time.perf_counter()
+        for entry in list(self.entries.values()):
+            if entry.state == 'prepared':
+                self.complete(entry)
+                if time.perf_counter() - started > budget:
+                    break
+
+    def progress(self):
+        # fraction of requested assets that are ready
+        if not self.entries:
+            return 1.0
+        return sum(entry.state == 'ready' for entry in list(self.entries.values())) / len(self.entries)
+
+    def done(self):
+        return self.progress() == 1.0
+
+loader = AssetLoader()
+
+class LazyFont:
+    """Default font at one size, loaded by the asset loader ahead of time or on first use, whichever comes first"""
+    def __init__(self, point_size):
+        self.point_size = point_size
+        self.font = None
+
+    def prepare(self):
+        started = time.perf_counter()
+        # Font(None) is the bundled default that SysFont(None) resolves to, minus the system font scan
+        font = pygame.font.Font(None, self.point_size)
+        startup.add('fonts', time.perf_counter() - started)
+        return font
+
+    def request(self):
+        loader.request(('font', self.point_size), self.prepare)
+
+    def __getattr__(self, name):
+        if self.font is None:
+            self.font = loader.get(('font', self.point_size), self.prepare)
+        return getattr(self.font, name)
+
 # fonts
-font = pygame.font.SysFont(None, 24)
-big_font = pygame.font.SysFont(None, 36)
+font = LazyFont(24)
+big_font = LazyFont(36)
+title_font = LazyFont(48)
+small_font = LazyFont(16)
+settings_font = LazyFont(42)
 
 # assets (generate simple pixel sprites at runtime if missing)
 assets_dir = os.path.join(os.path.dirname(__file__), 'assets')
@@ -52,6 +239,8 @@ def toggle_maximize():
         display = pygame.display.set_mode(base_window_res)
         window_res = base_window_res
         is_maximized = False
+    # set_mode hands back the same surface object, cleared: static scenes must redraw all of it
+    static_view.invalidate()
 
 def set_zoom(new_zoom):
     global zoom_level, base_window_res, window_res, display
@@ -60,20 +249,26 @@ def set_zoom(new_zoom):
     window_res = new_res
     display = pygame.display.set_mode(window_res)
     pygame.display.set_caption(f"{window_title} (Zoom: {zoom_level:.1f}x)")
+    static_view.invalidate()
 
-def update_camera(player_x, player_y):
+def update_camera(player_x, player_y, steps=1.0):
     global camera_x, camera_y
-    # smoothly follow player
+    # smoothly follow player; camera_smooth is per simulation tick, steps = ticks elapsed
     target_x = player_x - (window_res[0] / 2) / game_zoom
     target_y = player_y - (window_res[1] / 2) / game_zoom
+    k = 1 - (1 - camera_smooth) ** steps
     
-    camera_x += (target_x - camera_x) * camera_smooth
-    camera_y += (target_y - camera_y) * camera_smooth
+    camera_x += (target_x - camera_x) * k
+    camera_y += (target_y - camera_y) * k
     
     # clamp to world bounds
     camera_x = max(0, min(camera_x, WORLD_WIDTH - window_res[0] / game_zoom))
     camera_y = max(0, min(camera_y, WORLD_HEIGHT - window_res[1] / game_zoom))
 
+def lerp_pos(obj, alpha):
+    # position alpha of the way from the previous simulation tick to the current one
+    return obj.prev_x + (obj.x - obj.prev_x) * alpha, obj.prev_y + (obj.y - obj.prev_y) * alpha
+
 def world_to_screen(world_x, world_y):
     screen_x = (world_x - camera_x) * game_zoom
     screen_y = (world_y - camera_y) * game_zoom
@@ -84,179 +279,579 @@ def screen_to_world(screen_x, screen_y):
     world_y = screen_y / game_zoom + camera_y
     return world_x, world_y
 
+class TileChunks:
+    """Tiled background baked per zoom into surfaces of several tiles each, evicted by distance from the camera"""
+    def __init__(self, chunk_tiles=8, max_bytes=64 * 1024 * 1024):
+        self.chunk_tiles = chunk_tiles
+        self.max_bytes = max_bytes
+        self.zoom = None
+        self.chunks = {}
+        self.bytes = 0
+
+    def bake(self, cx, cy, zoom):
+        span = self.chunk_tiles * TILE_SIZE
+        origin_x = cx * span
+        origin_y = cy * span
+        size = int(math.ceil(span * zoom)) + 1
+        surf = pygame.Surface((size, size))
+        surf.fill(ocean_dark)
+        tile_w = int(TILE_SIZE * zoom) + 1
+        tile_h = int(TILE_SIZE * zoom) + 1
+        tiles_x = WORLD_WIDTH // TILE_SIZE
+        tiles_y = WORLD_HEIGHT // TILE_SIZE
+        for tx in range(cx * self.chunk_tiles, min((cx + 1) * self.chunk_tiles, tiles_x)):
+            for ty in range(cy * self.chunk_tiles, min((cy + 1) * self.chunk_tiles, tiles_y)):
+                color = ocean_dark if (tx + ty) % 2 == 0 else ocean_med
+                local_x = (tx * TILE_SIZE - origin_x) * zoom
+                local_y = (ty * TILE_SIZE - origin_y) * zoom
+                pygame.draw.rect(surf, color, (local_x, local_y, tile_w, tile_h))
+                # grid lines with glow
+                pygame.draw.rect(surf, (40, 80, 120), (local_x, local_y, tile_w, tile_h), 1)
+        return surf
+
+    def draw(self, surface, cam_x, cam_y, zoom, view_w, view_h):
+        zoom = round(zoom, 2)
+        if zoom != self.zoom:
+            self.chunks.clear()
+            self.bytes = 0
+            self.zoom = zoom
+        span = self.chunk_tiles * TILE_SIZE
+        last_cx = (WORLD_WIDTH // TILE_SIZE - 1) // self.chunk_tiles
+        last_cy = (WORLD_HEIGHT // TILE_SIZE - 1) // self.chunk_tiles
+        start_cx = max(0, int(cam_x // span))
+        start_cy = max(0, int(cam_y // span))
+        end_cx = min(last_cx, int((cam_x + view_w / zoom) // span))
+        end_cy = min(last_cy, int((cam_y + view_h / zoom) // span))
+        for cx in range(start_cx, end_cx + 1):
+            for cy in range(start_cy, end_cy + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    chunk = self.chunks[(cx, cy)] = self.bake(cx, cy, zoom)
+                    self.bytes += chunk.get_width() * chunk.get_height() * 4
+                surface.blit(chunk, (round((cx * span - cam_x) * zoom), round((cy * span - cam_y) * zoom)))
+        if self.bytes > self.max_bytes:
+            # drop the chunks farthest from the view centre first
+            mid_x = cam_x + view_w / zoom / 2
+            mid_y = cam_y + view_h / zoom / 2
+            def distance(key):
+                return ((key[0] + 0.5) * span - mid_x) ** 2 + ((key[1] + 0.5) * span - mid_y) ** 2
+            for key in sorted(self.chunks, key=distance, reverse=True):
+                if self.bytes <= self.max_bytes:
+                    break
+                if start_cx <= key[0] <= end_cx and start_cy <= key[1] <= end_cy:
+                    continue
+                chunk = self.chunks.pop(key)
+                self.bytes -= chunk.get_width() * chunk.get_height() * 4
+
+tile_chunks = TileChunks()
+
 def draw_tiles():
-    # draw tiled background
-    tile_color_a = ocean_dark
-    tile_color_b = ocean_med
-    
-    start_tile_x = int(camera_x // TILE_SIZE)
-    start_tile_y = int(camera_y // TILE_SIZE)
-    end_tile_x = int((camera_x + window_res[0] / game_zoom) // TILE_SIZE) + 1
-    end_tile_y = int((camera_y + window_res[1] / game_zoom) // TILE_SIZE) + 1
-    
-    for tx in range(start_tile_x, min(end_tile_x + 1, WORLD_WIDTH // TILE_SIZE)):
-        for ty in range(start_tile_y, min(end_tile_y + 1, WORLD_HEIGHT // TILE_SIZE)):
-            color = tile_color_a if (tx + ty) % 2 == 0 else tile_color_b
-            
-            world_x = tx * TILE_SIZE
-            world_y = ty * TILE_SIZE
-            screen_x, screen_y = world_to_screen(world_x, world_y)
-            
-            tile_w = int(TILE_SIZE * game_zoom) + 1
-            tile_h = int(TILE_SIZE * game_zoom) + 1
-            
-            pygame.draw.rect(display, color, (screen_x, screen_y, tile_w, tile_h))
-            # grid lines with glow
-            pygame.draw.rect(display, (40, 80, 120), (screen_x, screen_y, tile_w, tile_h), 1)
+    # draw tiled background from the baked chunks around the camera
+    tile_chunks.draw(display, camera_x, camera_y, game_zoom, window_res[0], window_res[1])
+
+class GlowCache:
+    """Bounded LRU of prerendered glow textures keyed by quantized radius, colour and intensity"""
+    def __init__(self, max_entries=256, intensity_steps=32):
+        self.max_entries = max_entries
+        self.intensity_steps = intensity_steps
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, radius, color, intensity):
+        return (int(radius), tuple(color[:3]), int(round(intensity * self.intensity_steps)))
+
+    def get(self, key):
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self.render(*key)
+        self.entries[key] = surf
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surf
+
+    def render(self, radius, color, level):
+        # concentric rings fading outwards, premultiplied onto black for additive blitting
+        intensity = level / self.intensity_steps
+        size = radius * 2 + 1
+        surf = pygame.Surface((size, size))
+        c = tuple(min(255, int(col + (255 - col) * 0.3)) for col in color)
+        for i in range(radius, 0, -2):
+            alpha = 255 * intensity * (1 - i / radius)
+            ring = tuple(int(col * alpha / 255) for col in c)
+            pygame.draw.circle(surf, ring, (radius, radius), i, 1)
+        return surf
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+glow_cache = GlowCache()
+
+class SpriteCache:
+    """Scaled and rotated copies of sprites for the current game zoom, LRU-bounded by pixel memory"""
+    def __init__(self, max_bytes=8 * 1024 * 1024, angle_step=2):
+        self.max_bytes = max_bytes
+        self.angle_step = angle_step
+        self.zoom = None
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def _lookup(self, key, zoom, build):
+        # zoom steps are 0.1 but accumulate float error, so compare rounded
+        zoom = round(zoom, 2)
+        if zoom != self.zoom:
+            self.clear()
+            self.zoom = zoom
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = build()
+        self.entries[key] = surf
+        self.bytes += surf.get_width() * surf.get_height() * 4
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * 4
+        return surf
+
+    def scaled(self, sprite, zoom):
+        def build():
+            w, h = sprite.get_size()
+            return pygame.transform.scale(sprite, (int(w * zoom), int(h * zoom)))
+        return self._lookup((sprite, None), zoom, build)
+
+    def rotated(self, sprite, zoom, angle):
+        step = self.angle_step
+        angle = int(round(angle / step)) * step % 360
+        return self._lookup((sprite, angle), zoom, lambda: pygame.transform.rotate(self.scaled(sprite, zoom), -angle))
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
+
+sprite_cache = SpriteCache()
+
+class TextCache:
+    """LRU of rendered text surfaces keyed by (font, text, colour)"""
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, fnt, text, color):
+        key = (fnt, text, tuple(color))
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self.entries[key] = fnt.render(text, True, color)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surf
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+text_cache = TextCache()
+
+class FrameProfiler:
+    """Per-phase frame timings in a ring buffer, shown as a stacked graph and exportable to CSV"""
+    PHASES = ('player', 'enemies', 'bullets', 'pickups', 'particles', 'popups', 'waves',
+              'tiles', 'entities', 'particle_fx', 'hud', 'minimap', 'other')
+    COLORS = ((200, 200, 200), (255, 90, 90), (255, 220, 80), (120, 255, 160), (100, 200, 255), (200, 140, 255), (150, 150, 150),
+              (40, 120, 200), (255, 150, 60), (60, 220, 220), (240, 240, 120), (255, 120, 200), (90, 90, 110))
+    COUNTS = ('enemies', 'bullets', 'particles', 'pickups', 'popups', 'drawn', 'culled',
+              'ai_near', 'ai_mid', 'ai_far', 'ai_deferred')
+
+    def __init__(self, frames=240, graph_h=90, graph_ms=25.0):
+        self.enabled = False
+        self.frames = frames
+        self.graph_h = graph_h
+        self.graph_ms = graph_ms
+        self.slots = {name: i for i, name in enumerate(self.PHASES)}
+        self.times = np.zeros((frames, len(self.PHASES)))
+        self.counts = np.zeros((frames, len(self.COUNTS)), np.int64)
+        self.frame_numbers = np.zeros(frames, np.int64)
+        self.current = np.zeros(len(self.PHASES))
+        self.frame = 0
+        self.frame_start = 0.0
+
+    def timed(self, phase, fn, *args):
+        # run fn, charging its duration to phase while profiling
+        if not self.enabled:
+            return fn(*args)
+        start = time.perf_counter()
+        result = fn(*args)
+        self.current[self.slots[phase]] += time.perf_counter() - start
+        return result
+
+    def begin_frame(self):
+        self.current[:] = 0.0
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self, counts):
+        if not self.enabled:
+            return
+        # whatever the named phases didn't cover (events, text, flip) is 'other'
+        total = time.perf_counter() - self.frame_start
+        self.current[-1] = max(0.0, total - self.current[:-1].sum())
+        row = self.frame % self.frames
+        self.times[row] = self.current
+        self.counts[row] = counts
+        self.frame_numbers[row] = self.frame
+        self.frame += 1
+
+    def history(self):
+        # recorded rows oldest first
+        n = min(self.frame, self.frames)
+        order = (np.arange(n) + self.frame - n) % self.frames
+        return self.frame_numbers[order], self.times[order], self.counts[order]
+
+    def draw(self, surface, x, y):
+        _, times, counts = self.history()
+        if len(times) == 0:
+            return
+        # stacked bars: one column per frame, one colour band per phase
+        px_per_s = self.graph_h / (self.graph_ms / 1000.0)
+        tops = np.minimum(np.cumsum(times, axis=1) * px_per_s, self.graph_h)
+        bottoms = np.concatenate([np.zeros((len(tops), 1)), tops[:, :-1]], axis=1)
+        rows = np.arange(self.graph_h)[None, :]
+        pixels = np.zeros((self.frames, self.graph_h, 3), np.uint8)
+        pixels[:] = (10, 10, 14)
+        for i, color in enumerate(self.COLORS):
+            band = (rows >= bottoms[:, i:i + 1]) & (rows < tops[:, i:i + 1])
+            pixels[:len(times)][band] = color
+        # y grows downwards on screen, bars grow upwards
+        graph = pygame.surfarray.make_surface(pixels[:, ::-1])
+        surface.blit(graph, (x, y))
+        # reference line at 60 fps
+        line_y = y + self.graph_h - int(px_per_s / 60)
+        pygame.draw.line(surface, white, (x, line_y), (x + self.frames - 1, line_y))
+        # legend with mean milliseconds per phase
+        means = times.mean(axis=0) * 1000
+        lx = x + self.frames + 6
+        for i, name in enumerate(self.PHASES):
+            ly = y + (i % 7) * 13
+            col = lx + (i // 7) * 110
+            pygame.draw.rect(surface, self.COLORS[i], (col, ly + 3, 8, 8))
+            surface.blit(render_text(small_font, f"{name} {means[i]:.1f}", foam), (col + 11, ly))
+        # latest entity counters above the graph
+        latest = '  '.join(f"{name} {value}" for name, value in zip(self.COUNTS, counts[-1].tolist()))
+        surface.blit(render_text(small_font, latest, foam), (x, y - 16))
+
+    def dump_csv(self, path):
+        frames, times, counts = self.history()
+        with open(path, 'w') as f:
+            f.write(','.join(('frame', 'frame_ms') + tuple(f"{p}_ms" for p in self.PHASES) + self.COUNTS) + '\n')
+            for frame, row, cnt in zip(frames.tolist(), (times * 1000).tolist(), counts.tolist()):
+                cells = [str(frame), f"{sum(row):.3f}"] + [f"{v:.3f}" for v in row] + [str(c) for c in cnt]
+                f.write(','.join(cells) + '\n')
+        return len(frames)
+
+profiler = FrameProfiler()
+
+# how far past the view edge an entity can still show: largest sprite/glow reach in world units,
+# plus screen pixels for popup text, which is drawn unscaled
+CULL_MARGIN = 24
+CULL_SCREEN_MARGIN = 40
+
+class ViewCuller:
+    """Per-frame visibility query against the camera's world rect; counts what it lets through and what it culls"""
+    def __init__(self, margin=CULL_MARGIN, screen_margin=CULL_SCREEN_MARGIN):
+        self.margin = margin
+        self.screen_margin = screen_margin
+        self.bounds = (0.0, 0.0, 0.0, 0.0)
+        self.drawn = 0
+        self.culled = 0
+
+    def begin(self):
+        # world rect shown this frame, grown by the margins; call after the camera has moved
+        m = self.margin + self.screen_margin / game_zoom
+        self.bounds = (camera_x - m, camera_y - m,
+                       camera_x + window_res[0] / game_zoom + m, camera_y + window_res[1] / game_zoom + m)
+        self.drawn = 0
+        self.culled = 0
+
+    def visible(self, x, y):
+        x0, y0, x1, y1 = self.bounds
+        if x0 <= x <= x1 and y0 <= y <= y1:
+            self.drawn += 1
+            return True
+        self.culled += 1
+        return False
+
+    def visible_mask(self, xs, ys):
+        # bulk version for array-backed entities
+        x0, y0, x1, y1 = self.bounds
+        mask = (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+        shown = int(np.count_nonzero(mask))
+        self.drawn += shown
+        self.culled += len(mask) - shown
+        return mask
+
+culler = ViewCuller()
+
+def render_text(fnt, text, color):
+    # antialiased text, re-rendered only when the string or colour changes
+    return text_cache.render(fnt, text, color)
 
 def draw_glow(pos, radius, color, intensity=0.3):
     """Draw a soft glow effect around a point"""
+    key = glow_cache.key(radius, color, intensity)
+    r = key[0]
+    if r <= 0 or key[2] <= 0:
+        return
     x, y = int(pos[0]), int(pos[1])
-    for i in range(int(radius), 0, -2):
-        alpha = int(255 * intensity * (1 - i / radius))
-        c = tuple(min(255, int(col + (255 - col) * 0.3)) for col in color)
-        pygame.draw.circle(display, c, (x, y), i, 1)
+    display.blit(glow_cache.get(key), (x - r, y - r), special_flags=pygame.BLEND_RGB_ADD)
+
+def rgba_surface(pixels):
+    # (w, h, 4) uint8 array -> per-pixel-alpha surface, copied in bulk
+    surf = pygame.Surface(pixels.shape[:2], pygame.SRCALPHA)
+    pygame.surfarray.pixels3d(surf)[:] = pixels[:, :, :3]
+    pygame.surfarray.pixels_alpha(surf)[:] = pixels[:, :, 3]
+    return surf
+
+def save_sprite(pixels, path):
+    surf = rgba_surface(pixels)
+    try:
+        pygame.image.save(surf, path)
+    except Exception:
+        pass
+    return surf
+
+# the generators paint whole regions of an RGBA array indexed [x, y]
 
 def generate_pixel_sprite(path, size=16, palette=None, symmetric=True):
-    # creates a small pixel art PNG using pygame and saves it
-    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    # creates a small pixel art PNG and saves it
     if palette is None:
         palette = [(255,100,200),(120,255,160),(100,160,255),(255,200,80),(180,100,255),(255,255,255),(60,60,60)]
-    for x in range(size):
-        for y in range(size):
-            # decide pixel
-            if random.random() < 0.45:
-                col = random.choice(palette)
-                surf.set_at((x,y), pygame.Color(*col))
-            else:
-                surf.set_at((x,y), pygame.Color(0,0,0,0))
+    rng = np.random.default_rng(random.getrandbits(32))
+    pixels = np.zeros((size, size, 4), np.uint8)
+    filled = rng.random((size, size)) < 0.45
+    pixels[filled, :3] = np.array(palette, np.uint8)[rng.integers(len(palette), size=int(filled.sum()))]
+    pixels[filled, 3] = 255
     if symmetric:
         # mirror left to right for nicer sprites
-        for x in range(size//2):
-            for y in range(size):
-                surf.set_at((size-1-x, y), surf.get_at((x,y)))
-    # save to disk
-    try:
-        pygame.image.save(surf, path)
-    except Exception:
-        pass
+        pixels[size - size//2:] = pixels[:size//2][::-1]
+    return save_sprite(pixels, path)
 
 def generate_person_sprite(path, size=24):
-    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    pixels = np.zeros((size, size, 4), np.uint8)
     # colors
-    skin = (255, 205, 148)
-    shirt = (60, 160, 220)
-    pants = (40, 40, 80)
-    hair = (40, 20, 10)
+    skin = (255, 205, 148, 255)
+    shirt = (60, 160, 220, 255)
+    pants = (40, 40, 80, 255)
+    hair = (40, 20, 10, 255)
     cx = size//2
     # head
-    for x in range(cx-3, cx+4):
-        for y in range(4, 10):
-            surf.set_at((x, y), pygame.Color(*skin))
+    pixels[cx-3:cx+4, 4:10] = skin
     # hair
-    for x in range(cx-4, cx+5):
-        surf.set_at((x, 3), pygame.Color(*hair))
+    pixels[cx-4:cx+5, 3] = hair
     # eyes
-    surf.set_at((cx-2, 7), pygame.Color(0,0,0))
-    surf.set_at((cx+2, 7), pygame.Color(0,0,0))
+    pixels[[cx-2, cx+2], 7] = (0, 0, 0, 255)
     # torso
-    for x in range(cx-4, cx+5):
-        for y in range(10, 16):
-            surf.set_at((x, y), pygame.Color(*shirt))
+    pixels[cx-4:cx+5, 10:16] = shirt
     # arms
-    for x in range(cx-7, cx-4):
-        for y in range(11,14):
-            surf.set_at((x, y), pygame.Color(*shirt))
-    for x in range(cx+5, cx+8):
-        for y in range(11,14):
-            surf.set_at((x, y), pygame.Color(*shirt))
+    pixels[cx-7:cx-4, 11:14] = shirt
+    pixels[cx+5:cx+8, 11:14] = shirt
     # legs
-    for x in range(cx-3, cx):
-        for y in range(16, size-2):
-            surf.set_at((x, y), pygame.Color(*pants))
-    for x in range(cx+1, cx+4):
-        for y in range(16, size-2):
-            surf.set_at((x, y), pygame.Color(*pants))
-    try:
-        pygame.image.save(surf, path)
-    except Exception:
-        pass
+    pixels[cx-3:cx, 16:size-2] = pants
+    pixels[cx+1:cx+4, 16:size-2] = pants
+    return save_sprite(pixels, path)
 
 def generate_crab_sprite(path, size=20):
-    surf = pygame.Surface((size, size), pygame.SRCALPHA)
-    body = (220, 80, 120)
-    eye = (255,255,255)
-    leg = (180,60,100)
+    pixels = np.zeros((size, size, 4), np.uint8)
+    body = (220, 80, 120, 255)
+    eye = (255, 255, 255, 255)
+    leg = (180, 60, 100, 255)
     cx = size//2
     cy = size//2 + 2
-    # body blob
-    for x in range(cx-6, cx+7):
-        for y in range(cy-4, cy+3):
-            # simple ellipse mask
-            if ((x-cx)**2)/36 + ((y-cy)**2)/9 <= 1.6:
-                surf.set_at((x,y), pygame.Color(*body))
+    # body blob: simple ellipse mask over the body's bounding box
+    bx = np.arange(cx-6, cx+7)[:, None]
+    by = np.arange(cy-4, cy+3)[None, :]
+    pixels[cx-6:cx+7, cy-4:cy+3][((bx-cx)**2)/36 + ((by-cy)**2)/9 <= 1.6] = body
     # claws
-    for x in range(2):
-        surf.set_at((2 + x, cy-2), pygame.Color(*leg))
-        surf.set_at((size-3 - x, cy-2), pygame.Color(*leg))
+    pixels[2:4, cy-2] = leg
+    pixels[size-4:size-2, cy-2] = leg
     # legs
-    for i in range(3):
-        lx = cx - 7 + i*2
-        surf.set_at((lx, cy+2), pygame.Color(*leg))
-        lx2 = cx + 7 - i*2
-        surf.set_at((lx2, cy+2), pygame.Color(*leg))
+    pixels[cx-7:cx-1:2, cy+2] = leg
+    pixels[cx+3:cx+8:2, cy+2] = leg
     # eyes on stalks
-    surf.set_at((cx-2, cy-5), pygame.Color(*eye))
-    surf.set_at((cx+2, cy-5), pygame.Color(*eye))
-    surf.set_at((cx-2, cy-6), pygame.Color(0,0,0))
-    surf.set_at((cx+2, cy-6), pygame.Color(0,0,0))
-    try:
-        pygame.image.save(surf, path)
-    except Exception:
-        pass
+    pixels[[cx-2, cx+2], cy-5] = eye
+    pixels[[cx-2, cx+2], cy-6] = (0, 0, 0, 255)
+    return save_sprite(pixels, path)
 
 def generate_gun_sprite(path, size=(28,10)):
     w, h = size
-    surf = pygame.Surface((w, h), pygame.SRCALPHA)
-    barrel = (50,50,50)
-    grip = (30,30,30)
+    pixels = np.zeros((w, h, 4), np.uint8)
     # draw barrel (to the right)
-    for x in range(0, w-8):
-        for y in range(2, h-2):
-            surf.set_at((x,y), pygame.Color(*barrel))
+    pixels[0:w-8, 2:h-2] = (50, 50, 50, 255)
     # muzzle
-    for x in range(w-8, w-5):
-        for y in range(3, h-3):
-            surf.set_at((x,y), pygame.Color(200,200,60))
+    pixels[w-8:w-5, 3:h-3] = (200, 200, 60, 255)
     # grip (downwards near left)
-    for x in range(6, 12):
-        for y in range(h-4, h):
-            surf.set_at((x,y), pygame.Color(*grip))
-    try:
-        pygame.image.save(surf, path)
-    except Exception:
-        pass
+    pixels[6:12, h-4:h] = (30, 30, 30, 255)
+    return save_sprite(pixels, path)
+
+ATLAS_VERSION = 1
+
+class SpriteAtlas:
+    """All sprites packed into one image; baked once per set of source files and cached on disk by content hash"""
+    def __init__(self, sources, cache_dir, padding=1):
+        self.sources = sources  # name -> png path
+        self.cache_dir = cache_dir
+        self.padding = padding
+        self.image = None
+        self.rects = {}
+        self.baked = False
+
+    def content_key(self):
+        # hash of the source bytes (not decoded), so a cache hit never touches the images themselves
+        digest = hashlib.sha1(f"atlas v{ATLAS_VERSION} pad {self.padding}".encode())
+        for name in sorted(self.sources):
+            digest.update(name.encode())
+            with open(self.sources[name], 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    def load(self):
+        self.finish(self.prepare())
+
+    def prepare(self):
+        # everything but the display-format conversion, so it can run off the main thread
+        key = self.content_key()
+        image_path = os.path.join(self.cache_dir, f"atlas_{key}.png")
+        index_path = os.path.join(self.cache_dir, f"atlas_{key}.json")
+        try:
+            with open(index_path) as f:
+                rects = json.load(f)
+            image = pygame.image.load(image_path)
+            self.baked = False
+        except (OSError, ValueError, pygame.error):
+            image, rects = self.bake()
+            self.save(key, image, rects)
+            self.baked = True
+        return image, rects
+
+    def finish(self, prepared):
+        image, rects = prepared
+        self.image = image.convert_alpha()
+        self.rects = {name: pygame.Rect(rect) for name, rect in rects.items()}
+
+    def bake(self):
+        # shelf packing, tallest first, into a sheet a power of two wide; pixels copied as arrays
+        images = {name: pygame.image.load(path) for name, path in self.sources.items()}
+        pad = self.padding
+        order = sorted(images, key=lambda name: (-images[name].get_height(), name))
+        area = sum((img.get_width() + pad) * (img.get_height() + pad) for img in images.values())
+        widest = max(img.get_width() for img in images.values()) + 2 * pad
+        width = 1 << (max(widest, math.isqrt(area) + 1) - 1).bit_length()
+        rects = {}
+        x = y = pad
+        shelf_h = 0
+        for name in order:
+            w, h = images[name].get_size()
+            if x + w + pad > width:
+                x = pad
+                y += shelf_h + pad
+                shelf_h = 0
+            rects[name] = [x, y, w, h]
+            x += w + pad
+            shelf_h = max(shelf_h, h)
+        sheet = pygame.Surface((width, y + shelf_h + pad), pygame.SRCALPHA)
+        rgb = pygame.surfarray.pixels3d(sheet)
+        alpha = pygame.surfarray.pixels_alpha(sheet)
+        for name, (x, y, w, h) in rects.items():
+            rgb[x:x + w, y:y + h] = pygame.surfarray.array3d(images[name])
+            alpha[x:x + w, y:y + h] = pygame.surfarray.array_alpha(images[name])
+        del rgb, alpha
+        return sheet, rects
+
+    def save(self, key, image, rects):
+        # best effort: without a writable cache every launch simply bakes again
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for old in glob.glob(os.path.join(self.cache_dir, 'atlas_*')):
+                if key not in os.path.basename(old):
+                    os.remove(old)
+            pygame.image.save(image, os.path.join(self.cache_dir, f"atlas_{key}.png"))
+            with open(os.path.join(self.cache_dir, f"atlas_{key}.json"), 'w') as f:
+                json.dump(rects, f)
+        except (OSError, pygame.error):
+            pass
+
+    def get(self, name):
+        # sprites are views into the atlas image, so they cost no extra pixels
+        if name not in self.rects:
+            return None
+        return self.image.subsurface(self.rects[name])
 
-# ensure player and a few enemy sprites exist
 player_sprite_path = os.path.join(assets_dir, 'player.png')
 gun_sprite_path = os.path.join(assets_dir, 'gun.png')
 enemy_sprite_path = os.path.join(assets_dir, 'crab.png')
-if not os.path.isfile(player_sprite_path):
-    generate_person_sprite(player_sprite_path, size=24)
-if not os.path.isfile(gun_sprite_path):
-    generate_gun_sprite(gun_sprite_path, size=(30,10))
-if not os.path.isfile(enemy_sprite_path):
-    generate_crab_sprite(enemy_sprite_path, 20)
-
-# load sprites
-try:
-    player_sprite = pygame.image.load(player_sprite_path).convert_alpha()
-    gun_sprite = pygame.image.load(gun_sprite_path).convert_alpha()
-    enemy_sprites = [pygame.image.load(enemy_sprite_path).convert_alpha()]
-except Exception:
-    player_sprite = None
-    gun_sprite = None
-    enemy_sprites = []
+# filled in by load_sprites(), through the asset loader
+atlas = None
+player_sprite = None
+gun_sprite = None
+enemy_sprites = []
+
+def prepare_sprites():
+    # loader thread: generate missing sprites, then read (or bake) the atlas sheet
+    global atlas
+    started = time.perf_counter()
+    # ensure player and a few enemy sprites exist
+    if not os.path.isfile(player_sprite_path):
+        generate_person_sprite(player_sprite_path, size=24)
+    if not os.path.isfile(gun_sprite_path):
+        generate_gun_sprite(gun_sprite_path, size=(30,10))
+    if not os.path.isfile(enemy_sprite_path):
+        generate_crab_sprite(enemy_sprite_path, 20)
+
+    # every sprite, including each enemy_*.png, comes out of one baked atlas
+    sources = {'player': player_sprite_path, 'gun': gun_sprite_path, 'crab': enemy_sprite_path}
+    for path in sorted(glob.glob(os.path.join(assets_dir, 'enemy_*.png'))):
+        sources[os.path.splitext(os.path.basename(path))[0]] = path
+    atlas = SpriteAtlas(sources, os.path.join(assets_dir, 'cache'))
+    prepared = atlas.prepare()
+    startup.add('assets', time.perf_counter() - started)
+    return prepared
+
+def finish_sprites(prepared):
+    # main thread: convert the sheet and hand out the sprites
+    global player_sprite, gun_sprite, enemy_sprites
+    atlas.finish(prepared)
+    player_sprite = atlas.get('player')
+    gun_sprite = atlas.get('gun')
+    enemy_sprites = [atlas.get(name) for name in atlas.sources if name == 'crab' or name.startswith('enemy_')]
+
+def request_assets():
+    # queue everything a game needs on the loader thread
+    for fnt in (font, big_font, title_font, small_font, settings_font):
+        fnt.request()
+    loader.request('sprites', prepare_sprites, finish_sprites)
+
+def load_sprites():
+    """Sprites ready to draw: waits for the loader (or loads them here) the first time, free after that"""
+    try:
+        loader.get('sprites', prepare_sprites, finish_sprites)
+    except Exception:
+        # a game still runs without sprites, on the fallback shapes
+        pass
 
 # basic colours (more vibrant palette)
 white = (255, 255, 255)
@@ -275,20 +870,137 @@ foam = (200, 230, 255)
 coral = (255, 120, 150)
 biolum = (100, 255, 200)  # bioluminescence
 # game update loop
-running = True
 clock = pygame.time.Clock()
+
+# an entity handle is its id with the id's generation above it; freeing an id bumps the generation,
+# so a handle to a removed entity never resolves to whatever reuses the id
+HANDLE_ID_BITS = 32
+HANDLE_ID_MASK = (1 << HANDLE_ID_BITS) - 1
+
+class EntityStore:
+    """Archetype storage: one packed column per component, typed arrays for numbers, stable handles, swap-remove on flush"""
+    def __init__(self, *components):
+        # (name, typecode) pairs: an array.array column, or a plain list where the typecode is None
+        self.components = [name for name, _ in components]
+        for name, typecode in components:
+            setattr(self, name, [] if typecode is None else array.array(typecode))
+        self.ids = array.array('q')  # slot -> handle of the entity in it
+        self.slots = array.array('i')  # id -> current slot, -1 while the id is free
+        self.generations = array.array('I')  # id -> generation of its current or next entity
+        self.free_ids = []
+        self.count = 0
+        self.killed = []  # handles to drop at the next flush
+        self.moves = 0  # bumped whenever rows move, so rows can cache their slot
+
+    def __len__(self):
+        return self.count
+
+    def free(self, handle):
+        i = handle & HANDLE_ID_MASK
+        self.slots[i] = -1
+        self.generations[i] = (self.generations[i] + 1) & 0xFFFFFFFF
+        self.free_ids.append(i)
+
+    def clear(self):
+        for handle in self.ids:
+            self.free(handle)
+        for name in self.components:
+            del getattr(self, name)[:]
+        del self.ids[:]
+        self.count = 0
+        self.killed.clear()
+        self.moves += 1
+
+    def spawn(self, **values):
+        # append one row and return its handle; every component must be given
+        if self.free_ids:
+            i = self.free_ids.pop()
+        else:
+            i = len(self.slots)
+            self.slots.append(-1)
+            self.generations.append(0)
+        handle = self.generations[i] << HANDLE_ID_BITS | i
+        self.slots[i] = self.count
+        self.ids.append(handle)
+        for name in self.components:
+            getattr(self, name).append(values[name])
+        self.count += 1
+        return handle
+
+    def slot_of(self, handle):
+        # current slot of an entity, or None once it has been removed
+        i = handle & HANDLE_ID_MASK
+        if i < len(self.slots) and self.generations[i] == handle >> HANDLE_ID_BITS:
+            return self.slots[i]
+        return None
+
+    def valid_slot(self, handle):
+        slot = self.slot_of(handle)
+        if slot is None:
+            raise KeyError(f"stale entity handle {handle:#x}")
+        return slot
+
+    def row(self, handle):
+        return EntityRow(self, handle)
+
+    def kill(self, handle):
+        # deferred so slots stay put while a system is iterating them
+        self.valid_slot(handle)
+        self.killed.append(handle)
+
+    def flush(self):
+        # O(1) per removal: move the last row into the hole; highest slots first so pending ones stay valid
+        if not self.killed:
+            return
+        columns = [getattr(self, name) for name in self.components]
+        ids = self.ids
+        for slot in sorted({self.slots[handle & HANDLE_ID_MASK] for handle in self.killed}, reverse=True):
+            self.free(ids[slot])
+            for col in columns:
+                col[slot] = col[-1]
+                col.pop()
+            moved = ids.pop()
+            if slot < len(ids):
+                ids[slot] = moved
+                self.slots[moved & HANDLE_ID_MASK] = slot
+            self.count -= 1
+        self.killed.clear()
+        self.moves += 1
+
+class EntityRow:
+    """Read-only attribute view of one entity by handle; follows it across flushes, raises KeyError once it is gone"""
+    __slots__ = ('store', 'handle', 'slot', 'moves')
+
+    def __init__(self, store, handle):
+        self.store = store
+        self.handle = handle
+        self.slot = store.valid_slot(handle)
+        self.moves = store.moves
+
+    def __getattr__(self, name):
+        store = self.store
+        if self.moves != store.moves:
+            self.slot = store.valid_slot(self.handle)
+            self.moves = store.moves
+        return getattr(store, name)[self.slot]
+
 # player movement speed (pixels per frame)
 PLAYER_SPEED = 3
 # cooldown system
+# simulated game seconds; every gameplay timer compares against this rather than the wall clock
+sim_time = 0.0
 shoot_cooldown = 0.0  # time until next shot allowed
 SHOOT_DELAY = 0.25  # cooldown between shots in seconds
 # quality-of-life globals
-popups = []  # floating text popups (e.g., +10)
+popups = EntityStore(('text', None), ('x', 'd'), ('y', 'd'), ('life', 'i'), ('vy', 'd'), ('color', None))  # floating text popups (e.g., +10)
 paused = False
 MAGNET_RADIUS = 140
 MAGNET_STRENGTH = 0.12
 MINIMAP_W = 160
 MINIMAP_H = 100
+# above this many enemies the minimap bins them into a density view instead of one dot each
+MINIMAP_DENSITY_THRESHOLD = 300
+MINIMAP_CELL = 4  # density bin size in minimap pixels
 # shield globals
 SHIELD_DURATION = 2.0
 shield_end_time = 0.0
@@ -301,23 +1013,27 @@ SETTINGS = {
     "fps_limit": 120,
     "max_ammo": 10,
     "bullet_speed": 5,
+    "swarm": False,  # numpy struct-of-arrays enemy backend
+    "swarm_worker": False,  # run the swarm step in a second process over shared memory
+    "minimap_hz": 10,  # minimap redraws per second
+    "ai_budget": 0,  # most distant-enemy AI updates per tick (near ones always update); 0 = no limit
 }
 
 class Player:
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         # health
         self.max_hp = 5
         self.hp = self.max_hp
-    def draw(self):
-        screen_x, screen_y = world_to_screen(self.x, self.y)
+    def draw(self, alpha=1.0):
+        screen_x, screen_y = world_to_screen(*lerp_pos(self, alpha))
         # draw sprite if available, otherwise a small fallback marker
         if 'player_sprite' in globals() and player_sprite:
-            w, h = player_sprite.get_size()
-            w = int(w * game_zoom)
-            h = int(h * game_zoom)
-            scaled = pygame.transform.scale(player_sprite, (w, h))
+            scaled = sprite_cache.scaled(player_sprite, game_zoom)
+            w, h = scaled.get_size()
             display.blit(scaled, (int(screen_x - w/2), int(screen_y - h/2)))
         else:
             # small, unobtrusive fallback marker (no large glow)
@@ -336,20 +1052,17 @@ class Player:
         hp_color = (int(255*(1-hp_ratio)), int(255*hp_ratio), 40) if hp_ratio < 0.5 else biolum
         pygame.draw.rect(display, hp_color, (bx, by, int(bar_w * hp_ratio), bar_h))
         # numeric hp label
-        hp_label = font.render(f"HP: {self.hp}/{self.max_hp}", True, white)
+        hp_label = render_text(font, f"HP: {self.hp}/{self.max_hp}", white)
         display.blit(hp_label, (int(screen_x - hp_label.get_width()/2), int(by - hp_label.get_height())))
         # ammo counter to the right of the HP bar
         try:
             ammo_text = f"Ammo: {AMMO}/{MAX_AMMO}"
         except Exception:
             ammo_text = "Ammo: ?"
-        ammo_surf = font.render(ammo_text, True, foam)
+        ammo_surf = render_text(font, ammo_text, foam)
         display.blit(ammo_surf, (int(bx + bar_w + 6 * game_zoom), int(by)))
         # draw shield bubble if active
-        try:
-            rem = max(0.0, shield_end_time - time.time())
-        except Exception:
-            rem = 0.0
+        rem = max(0.0, shield_end_time - sim_time)
         if rem > 0:
             # radius shrinks as remaining time approaches zero
             max_r = 42 * game_zoom
@@ -362,84 +1075,392 @@ class Player:
         self.y = max(0, min(self.y, h))
 
 BULLET_SPEED = 5
+# enemy separation radius; also the cell size of the enemy spatial grid
+AVOID_RADIUS = 60
+ENEMY_DEATH_FRAMES = 12
+# enemy body (8) plus bullet (3)
+BULLET_HIT_RADIUS = 8 + 3
 
-class Bullet:
-    def __init__(self, x, y, direction):
-        self.x = x
-        self.y = y
-        self.direction = direction
-        self.trail_counter = 0
-    def draw(self):
-        screen_x, screen_y = world_to_screen(self.x, self.y)
-        # draw a visible solid core for the bullet first (bright), then a smaller accent and subtle glow
-        core_r = int(4 * game_zoom)
-        accent_r = int(2 * game_zoom)
-        # core (bright) to make bullet easily visible (gold)
-        pygame.draw.circle(display, (255, 220, 80), (int(screen_x), int(screen_y)), core_r)
-        # inner accent for color
-        pygame.draw.circle(display, ocean_accent, (int(screen_x), int(screen_y)), accent_r)
-        # small subtle glow (reduced intensity)
-        draw_glow((screen_x, screen_y), 6 * game_zoom, ocean_accent, 0.08)
-    def update(self):
-        spd = SETTINGS.get('bullet_speed', BULLET_SPEED)
-        self.x += self.direction[0] * spd
-        self.y += self.direction[1] * spd
-        # add trail particles
-        self.trail_counter += 1
-        if self.trail_counter % 4 == 0:
-            # fewer trail particles and in a different color so they don't mask the bullet core
-            make_particles(self.x, self.y, ocean_accent, n=1)
+class SpatialGrid:
+    """Uniform grid bucketing objects with x/y by cell for fast neighbour queries"""
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        # id(obj) -> (cell key, insertion order)
+        self.slots = {}
+
+    def cell_of(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def rebuild(self, items):
+        self.cells.clear()
+        self.slots.clear()
+        for i, obj in enumerate(items):
+            if obj.alive:
+                key = self.cell_of(obj.x, obj.y)
+                self.cells.setdefault(key, []).append(obj)
+                self.slots[id(obj)] = (key, i)
+
+    def update(self, obj):
+        # re-bucket an object after it moved or died
+        slot = self.slots.get(id(obj))
+        if slot is None:
+            return
+        key, order = slot
+        if not obj.alive:
+            self.cells[key].remove(obj)
+            del self.slots[id(obj)]
+            return
+        new_key = self.cell_of(obj.x, obj.y)
+        if new_key != key:
+            self.cells[key].remove(obj)
+            self.cells.setdefault(new_key, []).append(obj)
+            self.slots[id(obj)] = (new_key, order)
+
+    def query(self, x, y, radius):
+        # candidates from every cell the radius can touch, in original list order
+        cx, cy = self.cell_of(x, y)
+        reach = int(math.ceil(radius / self.cell_size))
+        found = []
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                bucket = self.cells.get((gx, gy))
+                if bucket:
+                    found.extend(bucket)
+        if len(found) > 1:
+            slots = self.slots
+            found.sort(key=lambda o: slots[id(o)][1])
+        return found
+
+    def query_box(self, x0, y0, x1, y1):
+        # unordered candidates from every cell overlapping the box
+        gx0, gy0 = self.cell_of(x0, y0)
+        gx1, gy1 = self.cell_of(x1, y1)
+        found = []
+        for gx in range(gx0, gx1 + 1):
+            for gy in range(gy0, gy1 + 1):
+                bucket = self.cells.get((gx, gy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+def segment_circle_hit(x0, y0, x1, y1, cx, cy, r):
+    """Earliest t in [0, 1] where segment p0->p1 enters the circle, or None"""
+    fx = x0 - cx
+    fy = y0 - cy
+    c = fx*fx + fy*fy - r*r
+    if c <= 0:
+        # already inside at the start of the segment
+        return 0.0
+    dx = x1 - x0
+    dy = y1 - y0
+    a = dx*dx + dy*dy
+    if a == 0:
+        return None
+    b = 2 * (fx*dx + fy*dy)
+    disc = b*b - 4*a*c
+    if disc < 0:
+        return None
+    t = (-b - disc ** 0.5) / (2*a)
+    return t if 0 <= t <= 1 else None
+
+enemy_grid = SpatialGrid(AVOID_RADIUS)
+
+# flow field path costs: integer units per tile, so sums are exact and a field comes out the same
+# whatever it was derived from (the swarm worker, replays and snapshots rebuild fields independently)
+FLOW_COST_SCALE = 1000
+FLOW_UNREACHED = np.iinfo(np.int64).max // 2
+
+class FlowField:
+    """Per-tile chase directions toward the player's tile, built once per player tile and shared by every enemy"""
+    def __init__(self, cols, rows, tile=TILE_SIZE, max_fields=16):
+        self.cols = cols
+        self.rows = rows
+        self.tile = tile
+        self.max_fields = max_fields
+        # steps of a 5x5 stencil (16 directions) so paths across open ground stay close to straight lines
+        self.offsets = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)
+                        if (dx, dy) != (0, 0) and math.gcd(abs(dx), abs(dy)) == 1]
+        self.lengths = np.array([math.hypot(dx, dy) for dx, dy in self.offsets])
+        self.step_costs = np.round(self.lengths * FLOW_COST_SCALE).astype(np.int64)
+        self.units = np.array([(dx / l, dy / l) for (dx, dy), l in zip(self.offsets, self.lengths)])
+        self.fields = OrderedDict()  # player tile -> (fx, fy arrays, fx, fy nested lists, flat path costs)
+        self.current = None  # (tile, field) of the last lookup, the common case within a tick
+        self.builds = 0
+        self.set_blocked(np.zeros((cols, rows), bool))
+
+    def set_blocked(self, blocked):
+        # blocked[col, row] tiles can't be entered or cut across; every cached field is now stale
+        self.blocked = blocked
+        free = ~blocked
+        index = np.arange(self.cols * self.rows).reshape(self.cols, self.rows)
+        # flat index of each tile's neighbour along each step; a step that isn't allowed leads back to the tile
+        self.neighbours = np.empty((len(self.offsets), self.cols * self.rows), np.int64)
+        for k, (dx, dy) in enumerate(self.offsets):
+            # a step is allowed when every tile in its bounding box is free
+            ok = np.zeros((self.cols, self.rows), bool)
+            src = (slice(max(0, -dx), self.cols - max(0, dx)), slice(max(0, -dy), self.rows - max(0, dy)))
+            dst = (slice(src[0].start + dx, src[0].stop + dx), slice(src[1].start + dy, src[1].stop + dy))
+            ok[src] = True
+            for bx in range(min(0, dx), max(0, dx) + 1):
+                for by in range(min(0, dy), max(0, dy) + 1):
+                    shifted = np.zeros((self.cols, self.rows), bool)
+                    sx = slice(max(0, -bx), self.cols - max(0, bx))
+                    sy = slice(max(0, -by), self.rows - max(0, by))
+                    shifted[sx, sy] = free[sx.start + bx:sx.stop + bx, sy.start + by:sy.stop + by]
+                    ok &= shifted
+            step = index.copy()
+            step[src] = np.where(ok[src], index[dst], index[src])
+            self.neighbours[k] = step.ravel()
+        self.fields.clear()
+        self.current = None
+
+    def build(self, col, row, seed=None):
+        # path cost from the target tile, relaxed outward from a frontier of the tiles whose cost just dropped;
+        # seed: flat costs of another target's field. Those plus the trip between the two targets are real path
+        # costs, so they bound the new ones from above and only tiles the move brings closer are ever touched
+        target = col * self.rows + row
+        cost = np.full(self.cols * self.rows, FLOW_UNREACHED, np.int64)
+        if seed is not None and seed[target] < FLOW_UNREACHED:
+            reached = seed < FLOW_UNREACHED
+            cost[reached] = seed[reached] + seed[target]
+        cost[target] = 0
+        frontier = np.array([target])
+        dropped = np.zeros(len(cost), bool)
+        while len(frontier):
+            near = self.neighbours[:, frontier]
+            through = cost[frontier] + self.step_costs[:, None]
+            better = through < cost[near]
+            near = near[better]
+            np.minimum.at(cost, near, through[better])
+            dropped[near] = True
+            frontier = np.flatnonzero(dropped)
+            dropped[frontier] = False
+        # downhill along the cost gradient, which points straight at the target across open ground;
+        # tiles with an unreachable neighbour (walls, or unreachable themselves) take their best single step
+        grid = cost.reshape(self.cols, self.rows)
+        best = (cost[self.neighbours] + self.step_costs[:, None]).argmin(axis=0).reshape(self.cols, self.rows)
+        reachable = (grid < FLOW_UNREACHED) & (grid > 0)
+        step_x = np.where(reachable, self.units[best, 0], 0.0)
+        step_y = np.where(reachable, self.units[best, 1], 0.0)
+        gx, gy = np.gradient(np.where(grid < FLOW_UNREACHED, grid, np.nan))
+        norm = np.hypot(gx, gy)
+        smooth = np.isfinite(norm) & (norm > 0)
+        safe = np.where(smooth, norm, 1.0)
+        fx = np.where(smooth, -gx / safe, step_x)
+        fy = np.where(smooth, -gy / safe, step_y)
+        self.builds += 1
+        return fx, fy, fx.tolist(), fy.tolist(), cost
+
+    def field(self, tx, ty):
+        # only a new player tile costs a build, seeded from the last field; recent tiles stay cached
+        key = self.tile_of(tx, ty)
+        if self.current is not None and self.current[0] == key:
+            return self.current
+        entry = self.fields.get(key)
+        if entry is None:
+            seed = self.current[1][4] if self.current is not None else None
+            entry = self.fields[key] = self.build(*key, seed)
+            if len(self.fields) > self.max_fields:
+                self.fields.popitem(last=False)
+        else:
+            self.fields.move_to_end(key)
+        self.current = (key, entry)
+        return self.current
+
+    def tile_of(self, x, y):
+        return (min(self.cols - 1, max(0, int(x // self.tile))), min(self.rows - 1, max(0, int(y // self.tile))))
+
+    def chase_one(self, x, y, tx, ty):
+        """Unit chase vector for one position: its tile's flow far away, straight at (tx, ty) within a tile of it"""
+        (tcol, trow), (_, _, fx, fy, _) = self.field(tx, ty)
+        col, row = self.tile_of(x, y)
+        if abs(col - tcol) > 1 or abs(row - trow) > 1:
+            ux = fx[col][row]
+            uy = fy[col][row]
+            if ux or uy:
+                return ux, uy
+        dx = tx - x
+        dy = ty - y
+        dist = (dx*dx + dy*dy) ** 0.5
+        if dist == 0:
+            return 0.0, 0.0
+        return dx / dist, dy / dist
+
+    def chase(self, xs, ys, tx, ty):
+        """chase_one for arrays of positions"""
+        (tcol, trow), (fx, fy, _, _, _) = self.field(tx, ty)
+        col = np.clip(xs // self.tile, 0, self.cols - 1).astype(np.int64)
+        row = np.clip(ys // self.tile, 0, self.rows - 1).astype(np.int64)
+        far = (np.abs(col - tcol) > 1) | (np.abs(row - trow) > 1)
+        ux = np.where(far, fx[col, row], 0.0)
+        uy = np.where(far, fy[col, row], 0.0)
+        # straight at the target where the field gives no direction (near it, or unreachable)
+        dx = tx - xs
+        dy = ty - ys
+        dist = np.sqrt(dx*dx + dy*dy)
+        safe = np.where(dist > 0, dist, 1.0)
+        flow = (ux != 0) | (uy != 0)
+        ux = np.where(flow, ux, np.where(dist > 0, dx / safe, 0.0))
+        uy = np.where(flow, uy, np.where(dist > 0, dy / safe, 0.0))
+        return ux, uy
+
+flow_field = FlowField(-(-WORLD_WIDTH // TILE_SIZE), -(-WORLD_HEIGHT // TILE_SIZE))
+
+def draw_bullet(x, y):
+    screen_x, screen_y = world_to_screen(x, y)
+    # draw a visible solid core for the bullet first (bright), then a smaller accent and subtle glow
+    core_r = int(4 * game_zoom)
+    accent_r = int(2 * game_zoom)
+    # core (bright) to make bullet easily visible (gold)
+    pygame.draw.circle(display, (255, 220, 80), (int(screen_x), int(screen_y)), core_r)
+    # inner accent for color
+    pygame.draw.circle(display, ocean_accent, (int(screen_x), int(screen_y)), accent_r)
+    # small subtle glow (reduced intensity)
+    draw_glow((screen_x, screen_y), 6 * game_zoom, ocean_accent, 0.08)
+
+# enemy AI level of detail: (tier, max distance to the player, ticks between updates), nearest first;
+# the last tier must reach infinity, and the first must cover the player contact distance.
+# anything inside the view is near whatever its distance, so everything on screen moves every tick
+AI_LOD_TIERS = (('near', 1000, 1), ('mid', 1600, 2), ('far', math.inf, 4))
+AI_MAX_CATCHUP = 8  # most ticks of movement one late update makes up for
+# world size of the view until the game reports its own (the base window at zoom 1), and the margin
+# around it that covers the camera trailing the player
+AI_DEFAULT_VIEW = (float(base_window_res[0]), float(base_window_res[1]))
+AI_VIEW_MARGIN = 200
+
+class AILevelOfDetail:
+    """Schedules enemy AI by distance tier: near enemies every tick, distant ones in round-robin slices under a per-tick budget"""
+    def __init__(self, tiers=AI_LOD_TIERS):
+        self.names = tuple(name for name, _, _ in tiers)
+        self.bands = [(limit * limit, period) for _, limit, period in tiers]
+        # world size of the view; set through the recorded ('view', w, h) action so replays tier alike
+        self.view = AI_DEFAULT_VIEW
+        self.tick = 0
+        self.cursor = 0  # enemy index the next distant slice starts from
+        # per-tick and per-run counters: updates in each tier, and due updates pushed back by the budget
+        self.processed = [0] * len(tiers)
+        self.deferred = 0
+        self.totals = [0] * len(tiers)
+        self.total_deferred = 0
+
+    def reset(self):
+        self.view = AI_DEFAULT_VIEW
+        self.tick = 0
+        self.cursor = 0
+        self.processed = [0] * len(self.bands)
+        self.deferred = 0
+        self.totals = [0] * len(self.bands)
+        self.total_deferred = 0
 
+    def plan(self, enemies, px, py, budget=0):
+        # (enemy, ticks of movement) pairs to update this tick: every near enemy, then up to budget due
+        # distant ones, starting where the budget ran out last tick so none of them starves
+        self.tick += 1
+        tick = self.tick
+        bands = self.bands
+        # world rect the camera shows around the player, clamped to the world as update_camera does
+        vw, vh = self.view
+        x0 = max(0.0, min(px - vw / 2, WORLD_WIDTH - vw)) - AI_VIEW_MARGIN
+        y0 = max(0.0, min(py - vh / 2, WORLD_HEIGHT - vh)) - AI_VIEW_MARGIN
+        x1 = x0 + vw + 2 * AI_VIEW_MARGIN
+        y1 = y0 + vh + 2 * AI_VIEW_MARGIN
+        near = []
+        waiting = []
+        for i, e in enumerate(enemies):
+            if not e.alive:
+                continue
+            if e.ai_tick is None:
+                # first seen: its slot spreads a tier's enemies evenly over the ticks of a period
+                e.ai_tick = tick - 1
+                e.ai_slot = i
+            dx = e.x - px
+            dy = e.y - py
+            d2 = dx*dx + dy*dy
+            tier = 0
+            if not (x0 <= e.x <= x1 and y0 <= e.y <= y1):
+                while d2 > bands[tier][0]:
+                    tier += 1
+            if tier == 0:
+                near.append((i, 0, e))
+                continue
+            period = bands[tier][1]
+            # due on its slot, or on every tick once an update has been pushed back
+            if tick - e.ai_tick > period or (tick + e.ai_slot) % period == 0:
+                waiting.append((i, tier, e))
+        allowed = len(waiting) if budget <= 0 else min(budget, len(waiting))
+        start = next((k for k, item in enumerate(waiting) if item[0] >= self.cursor), 0)
+        waiting = waiting[start:] + waiting[:start]
+        self.deferred = max(0, len(waiting) - allowed)
+        self.cursor = waiting[allowed][0] if self.deferred else 0
+        self.total_deferred += self.deferred
+        processed = [0] * len(bands)
+        plan = []
+        for _, tier, e in near + waiting[:allowed]:
+            processed[tier] += 1
+            plan.append((e, min(tick - e.ai_tick, AI_MAX_CATCHUP)))
+            e.ai_tick = tick
+        self.processed = processed
+        self.totals = [a + b for a, b in zip(self.totals, processed)]
+        return plan
+
+ai_lod = AILevelOfDetail()
+
+class EnemyBase:
+    """Enemy behaviour and looks; subclasses store the simulation fields (x, y, prev_x, prev_y, speed, alive, death_time)"""
+    # slots rather than a per-instance dict: a large swarm holds thousands of these
+    __slots__ = ('color', 'sprite', 'avoid_radius', 'death_duration', 'ai_tick', 'ai_slot')
 
-class Enemy:
     def __init__(self, x, y, speed):
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         self.speed = speed
         self.alive = True
         # ocean themed colors
         self.color = random.choice([coral, biolum, ocean_accent, (150, 200, 255), (100, 180, 200)])
         # optionally assign a sprite
         self.sprite = None
-        self.avoid_radius = 60  # separation radius to avoid clustering
+        self.avoid_radius = AVOID_RADIUS  # separation radius to avoid clustering
         # death animation
         self.death_time = 0  # frames since death started (0 = alive)
-        self.death_duration = 12  # frames to animate death
+        self.death_duration = ENEMY_DEATH_FRAMES  # frames to animate death
+        # level-of-detail scheduling: tick of the last AI update and round-robin slot
+        self.ai_tick = None
+        self.ai_slot = 0
         
-    def draw(self):
-        screen_x, screen_y = world_to_screen(self.x, self.y)
+    def draw(self, alpha=1.0):
+        screen_x, screen_y = world_to_screen(*lerp_pos(self, alpha))
         
         if self.alive:
             if self.sprite:
-                w, h = self.sprite.get_size()
-                w = int(w * game_zoom)
-                h = int(h * game_zoom)
-                scaled = pygame.transform.scale(self.sprite, (w, h))
+                scaled = sprite_cache.scaled(self.sprite, game_zoom)
+                w, h = scaled.get_size()
                 display.blit(scaled, (int(screen_x - w/2), int(screen_y - h/2)))
             else:
                 pygame.draw.circle(display, self.color, (int(screen_x), int(screen_y)), int(10 * game_zoom))
                 # glow effect
                 draw_glow((screen_x, screen_y), 15 * game_zoom, self.color, 0.15)
         else:
-            # death animation: rely on particles only (no large glow circle)
-            # spawn a short burst of particles on death start
-            if self.death_time == 0:
-                make_particles(self.x, self.y, self.color, n=8)
+            # death animation: rely on particles only (no large glow circle);
+            # the burst itself is spawned by whatever killed the enemy
             # optionally draw a subtle fading dot (very small)
             if self.death_time < self.death_duration:
                 alpha_progress = 1 - (self.death_time / self.death_duration)
                 small_r = max(1, int(6 * game_zoom * alpha_progress))
                 pygame.draw.circle(display, self.color, (int(screen_x), int(screen_y)), small_r)
                 
-    def update(self, player, all_enemies):
+    def update(self, player, all_enemies, grid=None, ticks=1):
+        # ticks > 1 when distant and updated at a reduced rate: moves as far as that many updates would
         if not self.alive:
             return
-        # AI: move toward player but avoid other enemies
-        dx = player.x - self.x
-        dy = player.y - self.y
-        dist = (dx*dx + dy*dy) ** 0.5
-        
-        # separation: move away from nearby enemies
+        # AI: move toward player (along the shared flow field) but avoid other enemies
+        ux, uy = flow_field.chase_one(self.x, self.y, player.x, player.y)
+
+        # separation: move away from nearby enemies (only neighbouring cells when a grid is given)
+        if grid is not None:
+            all_enemies = grid.query(self.x, self.y, self.avoid_radius)
         sep_x, sep_y = 0, 0
         for other in all_enemies:
             if other is not self and other.alive:
@@ -452,64 +1473,574 @@ class Enemy:
                     sep_y += (ody / odist) * 0.5
         
         # combine: 70% chase, 30% separation
-        if dist != 0:
-            chase_x = (dx / dist) * 0.7
-            chase_y = (dy / dist) * 0.7
-        else:
-            chase_x = chase_y = 0
-            
+        chase_x = ux * 0.7
+        chase_y = uy * 0.7
+
         total_x = chase_x + sep_x * 0.3
         total_y = chase_y + sep_y * 0.3
         total_dist = (total_x*total_x + total_y*total_y) ** 0.5
         
         if total_dist > 0:
-            self.x += (total_x / total_dist) * self.speed
-            self.y += (total_y / total_dist) * self.speed
+            self.x += (total_x / total_dist) * self.speed * ticks
+            self.y += (total_y / total_dist) * self.speed * ticks
             
+    def bullet_hit_time(self, bullet):
+        # swept test along the bullet's movement this frame so fast bullets can't tunnel
+        if not self.alive:
+            return None
+        return segment_circle_hit(bullet.prev_x, bullet.prev_y, bullet.x, bullet.y, self.x, self.y, BULLET_HIT_RADIUS)
+
     def collide_with_bullet(self, bullet):
         # collision radius test (only if alive)
-        if not self.alive:
+        return self.bullet_hit_time(bullet) is not None
+
+class Enemy(EnemyBase):
+    """Enemy that keeps its simulation state in its own slots"""
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'speed', 'alive', 'death_time')
+
+def _swarm_field(name, cast):
+    # property reading/writing one slot of an EnemySwarm array
+    def fget(self):
+        return cast(getattr(self.swarm, name)[self.slot])
+    def fset(self, value):
+        getattr(self.swarm, name)[self.slot] = value
+    return property(fget, fset)
+
+class SwarmEnemy(EnemyBase):
+    """Enemy view whose simulation state lives in an EnemySwarm's arrays"""
+    __slots__ = ('swarm', 'slot')
+    x = _swarm_field('x', float)
+    y = _swarm_field('y', float)
+    prev_x = _swarm_field('prev_x', float)
+    prev_y = _swarm_field('prev_y', float)
+    speed = _swarm_field('speed', float)
+    alive = _swarm_field('alive', bool)
+    death_time = _swarm_field('death_time', int)
+
+    def __init__(self, swarm, slot, x, y, speed):
+        self.swarm = swarm
+        self.slot = slot
+        super().__init__(x, y, speed)
+
+class EnemySwarm:
+    """Struct-of-arrays enemy storage with batched chase, separation and player contact"""
+    FIELDS = (('x', 'f8'), ('y', 'f8'), ('prev_x', 'f8'), ('prev_y', 'f8'), ('speed', 'f8'),
+              ('alive', '?'), ('death_time', 'i4'))
+    # cell key = cx * INDEX_STRIDE + cy; far larger than any cell row count
+    INDEX_STRIDE = 1 << 20
+
+    def __init__(self, capacity=256, cell_size=AVOID_RADIUS):
+        self.cell_size = cell_size
+        self.count = 0
+        self.views = []
+        self.index_keys = np.zeros(0, np.int64)
+        self.index_slots = np.zeros(0, np.int64)
+        self.touching = np.zeros(0, np.int64)
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype))
+
+    def clear(self):
+        self.count = 0
+        self.views = []
+        self.index_keys = self.index_keys[:0]
+        self.index_slots = self.index_slots[:0]
+
+    def grow(self):
+        # double every array, keeping the contents
+        for name, _ in self.FIELDS:
+            old = getattr(self, name)
+            arr = np.zeros(len(old) * 2, old.dtype)
+            arr[:len(old)] = old
+            setattr(self, name, arr)
+
+    def add(self, x, y, speed):
+        if self.count == len(self.x):
+            self.grow()
+        e = SwarmEnemy(self, self.count, x, y, speed)
+        self.count += 1
+        self.views.append(e)
+        return e
+
+    def any_alive(self):
+        return bool(self.alive[:self.count].any())
+
+    def build_index(self):
+        # sort alive slots by (cell x, cell y) so a column of cells is one contiguous run
+        idx = np.flatnonzero(self.alive[:self.count])
+        cx = np.floor(self.x[idx] / self.cell_size).astype(np.int64)
+        cy = np.floor(self.y[idx] / self.cell_size).astype(np.int64)
+        keys = cx * self.INDEX_STRIDE + cy
+        order = np.argsort(keys, kind='stable')
+        self.index_keys = keys[order]
+        self.index_slots = idx[order]
+
+    def query_box(self, x0, y0, x1, y1):
+        # views of alive enemies whose cell overlaps the box (as of the last build_index)
+        cs = self.cell_size
+        gy0 = int(y0 // cs)
+        gy1 = int(y1 // cs)
+        found = []
+        for gx in range(int(x0 // cs), int(x1 // cs) + 1):
+            base = gx * self.INDEX_STRIDE
+            lo = np.searchsorted(self.index_keys, base + gy0, 'left')
+            hi = np.searchsorted(self.index_keys, base + gy1, 'right')
+            found.extend(self.views[i] for i in self.index_slots[lo:hi])
+        return found
+
+    def separation(self, xs, ys, radius):
+        # sum of unit push-away vectors from neighbours inside radius, using a cell-sorted grid
+        n = len(xs)
+        sep_x = np.zeros(n)
+        sep_y = np.zeros(n)
+        if n < 2:
+            return sep_x, sep_y
+        cx = np.floor(xs / self.cell_size).astype(np.int64)
+        cy = np.floor(ys / self.cell_size).astype(np.int64)
+        cx -= cx.min() - 1
+        cy -= cy.min() - 1
+        h = int(cy.max()) + 2
+        keys = cx * h + cy
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        # each pair is visited once: own cell plus the four 'forward' neighbours of the 3x3 block
+        offsets = np.array([0, 1, h - 1, h, h + 1])
+        wanted = (keys[None, :] + offsets[:, None]).ravel()
+        lo = np.searchsorted(sorted_keys, wanted, 'left')
+        counts = np.searchsorted(sorted_keys, wanted, 'right') - lo
+        total = int(counts.sum())
+        if total == 0:
+            return sep_x, sep_y
+        i = np.repeat(np.tile(np.arange(n), len(offsets)), counts)
+        run = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[np.repeat(lo, counts) + run]
+        # within the own cell keep only i < j so no pair is counted twice
+        same_cell = int(counts[:n].sum())
+        keep = np.ones(total, bool)
+        keep[:same_cell] = i[:same_cell] < j[:same_cell]
+        i, j = i[keep], j[keep]
+        odx = xs[i] - xs[j]
+        ody = ys[i] - ys[j]
+        d2 = odx*odx + ody*ody
+        near = (d2 > 0) & (d2 < radius * radius)
+        i, j, odx, ody = i[near], j[near], odx[near], ody[near]
+        odist = np.sqrt(d2[near])
+        # equal and opposite pushes for both members of the pair
+        push_x = odx / odist * 0.5
+        push_y = ody / odist * 0.5
+        sep_x += np.bincount(i, weights=push_x, minlength=n) - np.bincount(j, weights=push_x, minlength=n)
+        sep_y += np.bincount(i, weights=push_y, minlength=n) - np.bincount(j, weights=push_y, minlength=n)
+        return sep_x, sep_y
+
+    def advance(self, tx, ty, radius=AVOID_RADIUS):
+        """Advance every enemy one frame toward (tx, ty); returns the slots now touching it"""
+        n = self.count
+        if n == 0:
+            return np.zeros(0, np.int64)
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        alive = self.alive[:n]
+        self.death_time[:n][~alive] += 1
+        idx = np.flatnonzero(alive)
+        if len(idx) == 0:
+            return idx
+        xs = self.x[idx]
+        ys = self.y[idx]
+        # chase (70%) along the flow field plus separation (30%), same weights as Enemy.update
+        ux, uy = flow_field.chase(xs, ys, tx, ty)
+        chase_x = ux * 0.7
+        chase_y = uy * 0.7
+        sep_x, sep_y = self.separation(xs, ys, radius)
+        total_x = chase_x + sep_x * 0.3
+        total_y = chase_y + sep_y * 0.3
+        total_dist = np.sqrt(total_x*total_x + total_y*total_y)
+        safe = np.where(total_dist > 0, total_dist, 1.0)
+        step = np.where(total_dist > 0, self.speed[idx] / safe, 0.0)
+        xs = xs + total_x * step
+        ys = ys + total_y * step
+        self.x[idx] = xs
+        self.y[idx] = ys
+        # player contact test
+        dx = xs - tx
+        dy = ys - ty
+        return idx[(dx*dx + dy*dy) <= (10 + 6) ** 2]
+
+    def begin_step(self, target, radius=AVOID_RADIUS):
+        self.touching = self.advance(target.x, target.y, radius)
+
+    def finish_step(self):
+        # views touching the target after the step started by begin_step
+        return [self.views[i] for i in self.touching]
+
+    def step(self, target, radius=AVOID_RADIUS):
+        """Advance every enemy one frame; returns the views now touching target"""
+        self.begin_step(target, radius)
+        return self.finish_step()
+
+    def compact(self, duration=ENEMY_DEATH_FRAMES):
+        """Drop enemies whose death animation finished; returns the surviving views"""
+        n = self.count
+        keep = np.flatnonzero(self.alive[:n] | (self.death_time[:n] < duration))
+        if len(keep) < n:
+            for name, _ in self.FIELDS:
+                arr = getattr(self, name)
+                arr[:len(keep)] = arr[keep]
+            self.views = [self.views[i] for i in keep]
+            for slot, e in enumerate(self.views):
+                e.slot = slot
+            self.count = len(keep)
+        return self.views
+
+def release_shared(blocks):
+    # the creator unlinks; a mapping still referenced by a live array view is freed with that view
+    for shm in blocks:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+def swarm_worker(conn):
+    """Worker process body: steps swarm arrays that live in shared memory, one request per tick"""
+    swarm = EnemySwarm(0)
+    blocks = []
+    while True:
+        msg = conn.recv()
+        if msg[0] == 'attach':
+            # (re)map every field, e.g. after the owner grew its arrays
+            _, names, capacity = msg
+            for name, dtype in EnemySwarm.FIELDS:
+                setattr(swarm, name, np.zeros(0, dtype))
+            for shm in blocks:
+                shm.close()
+            # a spawned child shares the owner's resource tracker, so attaching doesn't claim the blocks
+            blocks = [shared_memory.SharedMemory(name=names[name]) for name, _ in EnemySwarm.FIELDS]
+            for shm, (name, dtype) in zip(blocks, EnemySwarm.FIELDS):
+                setattr(swarm, name, np.ndarray(capacity, dtype, buffer=shm.buf))
+        elif msg[0] == 'step':
+            _, swarm.count, tx, ty, radius = msg
+            conn.send(swarm.advance(tx, ty, radius).tolist())
+        else:
+            break
+    for name, dtype in EnemySwarm.FIELDS:
+        setattr(swarm, name, np.zeros(0, dtype))
+    for shm in blocks:
+        shm.close()
+
+class SharedSwarm(EnemySwarm):
+    """EnemySwarm whose arrays live in shared memory and whose step runs in a worker process"""
+    def __init__(self, capacity=256, cell_size=AVOID_RADIUS):
+        super().__init__(0, cell_size)
+        self.blocks = {}
+        self.conn = None
+        self.worker = None
+        self.remap = True  # worker must (re)attach before its next step
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        # fresh shared blocks for every field, filled from the current arrays; the old blocks are released
+        old = self.blocks
+        self.blocks = {}
+        for name, dtype in self.FIELDS:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, capacity * np.dtype(dtype).itemsize))
+            arr = np.ndarray(capacity, dtype, buffer=shm.buf)
+            prev = getattr(self, name)
+            arr[:] = 0
+            arr[:len(prev)] = prev
+            self.blocks[name] = shm
+            setattr(self, name, arr)
+        # the worker keeps its mappings of the old blocks until it is told the new names
+        release_shared(old.values())
+        self.remap = True
+
+    def grow(self):
+        self.allocate(len(self.x) * 2)
+
+    def start(self):
+        # spawn rather than fork: the child must not inherit the window or SDL state
+        ctx = multiprocessing.get_context('spawn')
+        conn, child = ctx.Pipe()
+        worker = ctx.Process(target=swarm_worker, args=(child,), daemon=True)
+        worker.start()
+        self.conn, self.worker = conn, worker
+        atexit.register(self.close)
+
+    def begin_step(self, target, radius=AVOID_RADIUS):
+        # hand the tick to the worker; the arrays are not touched here until finish_step
+        if self.remap:
+            # only ever the current names, so the worker never sees a block that was already released
+            self.conn.send(('attach', {name: shm.name for name, shm in self.blocks.items()}, len(self.x)))
+            self.remap = False
+        self.conn.send(('step', self.count, float(target.x), float(target.y), radius))
+
+    def finish_step(self):
+        return [self.views[i] for i in self.conn.recv()]
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.send(('stop',))
+            except OSError:
+                pass
+            self.worker.join(timeout=2)
+            self.conn = None
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(0, dtype))
+        release_shared(self.blocks.values())
+        self.blocks = {}
+
+swarm = EnemySwarm()
+swarm_mode = False
+
+def select_swarm_backend(worker):
+    """Swap the swarm between in-process arrays and a worker process over shared memory"""
+    global swarm
+    if worker == isinstance(swarm, SharedSwarm):
+        return
+    if isinstance(swarm, SharedSwarm):
+        swarm.close()
+    swarm = EnemySwarm()
+    if worker:
+        shared = SharedSwarm()
+        try:
+            shared.start()
+            swarm = shared
+        except Exception:
+            # no worker (e.g. the process can't spawn): keep the in-process arrays
+            shared.close()
+
+PARTICLE_GRAVITY = 0.1
+
+class ParticlePool:
+    """Fixed-capacity particle storage in preallocated arrays, live particles packed at the front"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity, np.int32)
+        self.max_life = np.ones(capacity, np.int32)
+        self.size = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, x, y, vx, vy, life, color, size):
+        # O(1): write into the next free slot; drop the particle when the pool is full
+        i = self.count
+        if i == self.capacity:
             return False
-        dx = self.x - bullet.x
-        dy = self.y - bullet.y
-        return (dx*dx + dy*dy) <= (8 + 3) ** 2
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.life[i] = life
+        self.max_life[i] = life
+        self.size[i] = size
+        self.color[i] = color[:3]
+        self.count = i + 1
+        return True
+
+    def step(self, gravity=PARTICLE_GRAVITY):
+        # move, apply gravity and age every live particle at once, then compact out the expired
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += gravity
+        self.life[:n] -= 1
+        alive = self.life[:n] > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            k = len(keep)
+            for arr in (self.x, self.y, self.vx, self.vy, self.life, self.max_life, self.size, self.color):
+                arr[:k] = arr[keep]
+            self.count = k
+
+PARTICLE_CAPACITY = 16384
 
 player = Player(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
 AMMO = SETTINGS.get('max_ammo', 10)
 MAX_AMMO = SETTINGS.get('max_ammo', 10)
 reload_cooldown = 0.0
 RELOAD_TIME = 1.5  # increased reload time to prevent spamming
-bullets = []
+# prev_x/prev_y: position at the start of the tick, for swept collision
+bullets = EntityStore(('x', 'd'), ('y', 'd'), ('prev_x', 'd'), ('prev_y', 'd'), ('dx', 'd'), ('dy', 'd'), ('trail', 'i'))
 enemies = []
 score = 0
-particles = []
-pickups = []
+particles = ParticlePool(PARTICLE_CAPACITY)
+pickups = EntityStore(('x', 'd'), ('y', 'd'), ('kind', None), ('ttl', 'i'), ('picked', 'b'), ('size', 'd'), ('shrink_rate', 'd'))
+
+def spawn_bullet(x, y, direction):
+    return bullets.spawn(x=x, y=y, prev_x=x, prev_y=y, dx=direction[0], dy=direction[1], trail=0)
 
 def spawn_pickup(x, y, kind):
     # kind: 'ammo', 'health', 'coin'
     # include visual state for shrink-on-pickup
-    pickups.append({'x': x, 'y': y, 'kind': kind, 'ttl': 600, 'picked': False, 'size': 6 * game_zoom, 'shrink_rate': 0.35})
+    return pickups.spawn(x=x, y=y, kind=kind, ttl=600, picked=False, size=6 * game_zoom, shrink_rate=0.35)
+
+def spawn_popup(text, x, y, color=foam, life=60, vy=-0.6):
+    return popups.spawn(text=text, x=x, y=y, life=life, vy=vy, color=color)
 
 def make_particles(x, y, color, n=10):
     for i in range(n):
         ang = random.uniform(0, 2*math.pi)
         speed = random.uniform(1.5, 5.5)
         lifetime = random.randint(20, 50)  # longer life for better fade effect
-        particles.append({
-            'x': x, 'y': y, 
-            'vx': math.cos(ang)*speed, 
-            'vy': math.sin(ang)*speed, 
-            'life': lifetime, 
-            'max_life': lifetime,
-            'color': color,
-            'size': random.uniform(1.5, 4)  # larger particlesw
-        })
+        size = random.uniform(1.5, 4)  # larger particles
+        particles.spawn(x, y, math.cos(ang)*speed, math.sin(ang)*speed, lifetime, color, size)
+
+# particle light layer: screen pixels per light pixel, light pixels per glow cell, glow reach in screen pixels at zoom 1
+LIGHT_LAYER_SCALE = 2
+LIGHT_GLOW_SCALE = 2
+PARTICLE_GLOW_RADIUS = 8
+
+def box_blur(a, r, axis):
+    # mean over a 2r+1 window along axis, zero past the edges; r is a few cells, so shifted sums beat a cumsum
+    out = a.copy()
+    n = a.shape[axis]
+    for d in range(1, r + 1):
+        ahead = [slice(None)] * a.ndim
+        behind = [slice(None)] * a.ndim
+        ahead[axis] = slice(d, n)
+        behind[axis] = slice(0, n - d)
+        out[tuple(ahead)] += a[tuple(behind)]
+        out[tuple(behind)] += a[tuple(ahead)]
+    out *= 1.0 / (2 * r + 1)
+    return out
+
+class ParticleLightLayer:
+    """Every visible particle splatted into one low-resolution light buffer, blurred into glow, added to the screen in one blit"""
+    def __init__(self, scale=LIGHT_LAYER_SCALE, glow_scale=LIGHT_GLOW_SCALE, glow_radius=PARTICLE_GLOW_RADIUS):
+        self.scale = scale
+        self.glow_scale = glow_scale
+        self.glow_radius = glow_radius
+
+    def draw(self, surface, sx, sy, sizes, ratios, colors, glow=True):
+        # sx, sy: screen pixels; sizes: core radius in screen pixels; ratios: life left; colors: (n, 3) uint8
+        s = self.scale
+        g = self.glow_scale
+        r = max(1, round(self.glow_radius * game_zoom / (s * g))) if glow else 0
+        lx = sx // s
+        ly = sy // s
+        # work only on the buffer rect the particles (and their glow) can reach
+        reach = (2 * r + 1) * g
+        x0 = max(int(lx.min()) - reach, 0)
+        y0 = max(int(ly.min()) - reach, 0)
+        x1 = min(int(lx.max()) + reach + 1, -(-surface.get_width() // s))
+        y1 = min(int(ly.max()) + reach + 1, -(-surface.get_height() // s))
+        w = x1 - x0
+        h = y1 - y0
+        if w <= 0 or h <= 0:
+            return
+        inside = (lx >= x0) & (lx < x1) & (ly >= y0) & (ly < y1)
+        lx = lx[inside] - x0
+        ly = ly[inside] - y0
+        # buffers are rows of B, G, R, A bytes, the usual display layout, so pygame wraps them without converting
+        colors = colors[inside][:, ::-1].astype(np.float32)
+        ratios = ratios[inside]
+        area = (sizes[inside] / s) ** 2
+        # a core puts its whole disc worth of light into its buffer pixel: small sparks saturate like solid dots,
+        # and cores wider than a buffer pixel also light the four around it
+        big = np.flatnonzero(area >= 1.0)
+        cx = np.concatenate([lx, np.clip(lx[big] - 1, 0, w - 1), np.clip(lx[big] + 1, 0, w - 1), lx[big], lx[big]])
+        cy = np.concatenate([ly, ly[big], ly[big], np.clip(ly[big] - 1, 0, h - 1), np.clip(ly[big] + 1, 0, h - 1)])
+        spread = np.tile(big, 4)
+        core = math.pi * area
+        cells, light = self.splat(cy * w + cx, np.concatenate([colors, colors[spread]]), np.concatenate([core, core[spread]]), w * h)
+        # scale over-bright pixels down by their brightest channel rather than clipping each, so hues survive
+        peak = np.maximum(np.maximum(light[:, 0], light[:, 1]), np.maximum(light[:, 2], 255.0))
+        light *= (255.0 / peak)[:, None]
+        image = np.zeros((h * w, 4), np.uint8)
+        image[cells, :3] = light
+        layer = pygame.image.frombuffer(image, (w, h), 'BGRA')
+        if glow:
+            # the glow spreads about the core's area worth of light, on a coarser grid since it is smooth anyway
+            gw = -(-w // g)
+            gh = -(-h // g)
+            cells, light = self.splat((ly // g) * gw + lx // g, colors, ratios * (0.8 / (g * g)) * area, gw * gh)
+            halo = np.zeros((gh * gw, 3), np.float32)
+            halo[cells] = light
+            halo = halo.reshape(gh, gw, 3)
+            for axis in (0, 1):
+                halo = box_blur(box_blur(halo, r, axis), r, axis)
+            glow_image = np.zeros((gh, gw, 4), np.uint8)
+            glow_image[..., :3] = np.minimum(halo, 255.0)
+            glow_layer = pygame.transform.scale(pygame.image.frombuffer(glow_image, (gw, gh), 'BGRA'), (gw * g, gh * g))
+            layer.blit(glow_layer, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        surface.blit(pygame.transform.scale(layer, (w * s, h * s)), (x0 * s, y0 * s), special_flags=pygame.BLEND_RGB_ADD)
+
+    def splat(self, cell, colors, weights, size):
+        # summed colour per buffer pixel: (flat pixel indices, (pixels, 3) sums) for the pixels hit,
+        # or for every pixel (indices slice(None)) once hits are dense enough that sorting them costs more
+        if len(cell) * 8 < size:
+            cells, which = np.unique(cell, return_inverse=True)
+        else:
+            cells, which = slice(None), cell
+        count = size if isinstance(cells, slice) else len(cells)
+        light = np.empty((count, 3), np.float32)
+        for c in range(3):
+            light[:, c] = np.bincount(which, colors[:, c] * weights, minlength=count)
+        return cells, light
+
+particle_light = ParticleLightLayer()
+# below this many visible particles one draw each costs less than the light layer's fixed per-frame work
+PARTICLE_BATCH_MIN = 500
+
+def draw_particle_dots(sx, sy, sizes, ratios, colors, glow=True):
+    # one circle (and cached glow) per particle
+    for px, py, sz, ratio, color in zip(sx.tolist(), sy.tolist(), sizes.astype(int).tolist(), ratios.tolist(),
+                                        [tuple(c) for c in colors.tolist()]):
+        if sz <= 0:
+            continue
+        pygame.draw.circle(display, color, (px, py), sz)
+        if glow:
+            # enhanced glow: brighter and larger (reduced intensity so bullets remain prominent)
+            draw_glow((px, py), int(sz * 3.5), color, 0.12 * ratio)
+
+def draw_particles(alpha=1.0, glow=True):
+    # screen position and fade of every live particle computed in bulk; few are drawn one by one,
+    # many are splatted into the light layer at once
+    n = len(particles)
+    if n == 0:
+        return
+    # step back along this tick's velocity (before gravity) to interpolate
+    back = 1.0 - alpha
+    world_px = particles.x[:n] - particles.vx[:n] * back
+    world_py = particles.y[:n] - (particles.vy[:n] - PARTICLE_GRAVITY) * back
+    screen_px, screen_py = world_to_screen(world_px, world_py)
+    alpha_ratio = particles.life[:n] / particles.max_life[:n]
+    size = particles.size[:n] * game_zoom * alpha_ratio
+    shown = np.flatnonzero(culler.visible_mask(world_px, world_py) & (size >= 0.5))
+    if len(shown) == 0:
+        return
+    sx = screen_px[shown].astype(np.int64)
+    sy = screen_py[shown].astype(np.int64)
+    if len(shown) < PARTICLE_BATCH_MIN:
+        draw_particle_dots(sx, sy, size[shown], alpha_ratio[shown], particles.color[shown], glow)
+    else:
+        particle_light.draw(display, sx, sy, size[shown], alpha_ratio[shown], particles.color[shown], glow)
 
 def spawn_enemies(count, append=False):
     # spawn enemies relative to the player's current position so gameplay is more intense
     # if append==False replace current enemies, otherwise add to them
+    global swarm_mode
     if not append:
         enemies.clear()
+        # the backend is chosen per game so a wave never mixes the two
+        swarm_mode = SETTINGS.get('swarm', False)
+        if swarm_mode:
+            select_swarm_backend(SETTINGS.get('swarm_worker', False))
+            swarm.clear()
     px = player.x
     py = player.y
     # spawn radius around player (min, max)
@@ -523,14 +2054,473 @@ def spawn_enemies(count, append=False):
         # clamp to world bounds
         x = max(0, min(WORLD_WIDTH, x))
         y = max(0, min(WORLD_HEIGHT, y))
-        e = Enemy(x, y, SETTINGS["enemy_speed"])
+        if swarm_mode:
+            e = swarm.add(x, y, SETTINGS["enemy_speed"])
+        else:
+            e = Enemy(x, y, SETTINGS["enemy_speed"])
         # assign a random enemy sprite if available
         if enemy_sprites:
             e.sprite = random.choice(enemy_sprites)
         enemies.append(e)
 
+def enemy_touch_player(e):
+    # enemy touching the player: pushed back while shielded, otherwise it hits and dies
+    dx = e.x - player.x
+    dy = e.y - player.y
+    dist_ep = (dx*dx + dy*dy) ** 0.5
+    rem = max(0.0, shield_end_time - sim_time)
+    if rem > 0:
+        # push enemy away from player a bit
+        if dist_ep == 0:
+            nx, ny = random.uniform(-1,1), random.uniform(-1,1)
+        else:
+            nx, ny = dx / dist_ep, dy / dist_ep
+        e.x += nx * 16
+        e.y += ny * 16
+        # small visual feedback
+        make_particles(e.x, e.y, e.color, n=6)
+    else:
+        # enemy hits player
+        e.alive = False
+        e.death_time = 0  # start death animation
+        player.hp -= 1
+        make_particles(e.x, e.y, e.color, n=12)
+        spawn_pickup(e.x, e.y, 'coin')
+
+def bullet_first_hit(b):
+    # broadphase: only enemies in cells around this frame's path; narrowphase: earliest swept hit
+    x0, x1 = min(b.prev_x, b.x), max(b.prev_x, b.x)
+    y0, y1 = min(b.prev_y, b.y), max(b.prev_y, b.y)
+    r = BULLET_HIT_RADIUS
+    index = swarm if swarm_mode else enemy_grid
+    first, first_t = None, None
+    for e in index.query_box(x0 - r, y0 - r, x1 + r, y1 + r):
+        t = e.bullet_hit_time(b)
+        if t is not None and (first_t is None or t < first_t):
+            first, first_t = e, t
+    return first
+
+def draw_gun(alpha=1.0):
+    # gun follows the cursor, rotated so that 0deg points to the right
+    if 'gun_sprite' in globals() and gun_sprite:
+        px, py = lerp_pos(player, alpha)
+        mx, my = pygame.mouse.get_pos()
+        # convert screen to world for angle calculation
+        world_mx, world_my = screen_to_world(mx, my)
+        ang = math.degrees(math.atan2(world_my - py, world_mx - px))
+        rot = sprite_cache.rotated(gun_sprite, game_zoom, ang)
+        player_screen_x, player_screen_y = world_to_screen(px, py)
+        rrect = rot.get_rect(center=(int(player_screen_x), int(player_screen_y)))
+        display.blit(rot, rrect.topleft)
+
+def start_game(seed=None):
+    # apply settings and reset the run; a seed makes the whole run reproducible from its inputs
+    global PLAYER_SPEED, wave, wave_active, AMMO, MAX_AMMO, score, scene, camera_x, camera_y
+    global sim_time, shoot_cooldown, reload_cooldown, shield_end_time, shield_active, paused
+    # sprites are first needed here, so the menu can come up without them
+    load_sprites()
+    # seeded after loading, since generating missing sprites draws from the same generator
+    if seed is not None:
+        random.seed(seed)
+    PLAYER_SPEED = SETTINGS['player_speed']
+    sim_time = 0.0
+    shoot_cooldown = reload_cooldown = shield_end_time = 0.0
+    shield_active = False
+    paused = False
+    wave = 1
+    wave_active = True
+    # back to the centre before the wave spawns around the player, so every game starts from the same place
+    player.x, player.y = WORLD_WIDTH / 2, WORLD_HEIGHT / 2
+    player.prev_x, player.prev_y = player.x, player.y
+    camera_x = player.x - (window_res[0] / 2) / game_zoom
+    camera_y = player.y - (window_res[1] / 2) / game_zoom
+    spawn_enemies(SETTINGS['enemy_count'] * wave)
+    bullets.clear()
+    pickups.clear()
+    particles.clear()
+    popups.clear()
+    # show the new wave on the minimap straight away
+    minimap.next_refresh = 0.0
+    ai_lod.reset()
+    player.hp = player.max_hp
+    AMMO = SETTINGS.get('max_ammo', 10)
+    MAX_AMMO = SETTINGS.get('max_ammo', 10)
+    score = 0
+    scene = 'game'
+
+def try_shoot(target_x, target_y):
+    # fire toward a world position if the cooldowns and ammo allow it
+    global AMMO, shoot_cooldown
+    now = sim_time
+    # check shooting cooldown and ensure not reloading
+    if paused or now < shoot_cooldown or now < reload_cooldown:
+        return False
+    dir_x = target_x - player.x
+    dir_y = target_y - player.y
+    length = (dir_x**2 + dir_y**2) ** 0.5
+    if length != 0:
+        dir_x /= length
+        dir_y /= length
+    # decrement ammo properly
+    if AMMO <= 0:
+        # out of ammo sound or feedback could go here
+        return False
+    AMMO -= 1
+    spawn_bullet(player.x, player.y, (dir_x, dir_y))
+    shoot_cooldown = now + SHOOT_DELAY  # set cooldown
+    return True
+
+def try_reload():
+    # reload with a cooldown so it can't be spammed
+    global AMMO, reload_cooldown
+    now = sim_time
+    if now >= reload_cooldown and AMMO < MAX_AMMO:
+        AMMO = MAX_AMMO
+        reload_cooldown = now + RELOAD_TIME
+
+def activate_shield():
+    # start shield for SHIELD_DURATION
+    global shield_end_time, shield_active
+    shield_end_time = sim_time + SHIELD_DURATION
+    shield_active = True
+
+def pickup_color(kind):
+    return (255, 220, 80) if kind == 'coin' else (120, 255, 160) if kind == 'ammo' else (255, 100, 120)
+
+def update_player(keys):
+    # movement from held keys plus shield expiry
+    global shield_active
+    player.prev_x, player.prev_y = player.x, player.y
+    speed = SETTINGS['player_speed']
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        player.x -= speed
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        player.x += speed
+    if keys[pygame.K_UP] or keys[pygame.K_w]:
+        player.y -= speed
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        player.y += speed
+    # keep player in world bounds
+    player.clamp(WORLD_WIDTH, WORLD_HEIGHT)
+    # update shield state
+    if shield_end_time <= sim_time:
+        shield_active = False
+
+def begin_enemies():
+    # swarm: start the batched step against the player's position this tick (it may run in the worker)
+    if swarm_mode:
+        swarm.speed[:swarm.count] = SETTINGS['enemy_speed']
+        swarm.begin_step(player)
+
+def finish_enemies():
+    # collect the step, resolve player contacts and index the swarm for the bullet pass
+    if swarm_mode:
+        for e in swarm.finish_step():
+            enemy_touch_player(e)
+        swarm.build_index()
+    else:
+        enemy_grid.rebuild(enemies)
+        for e in enemies:
+            e.prev_x, e.prev_y = e.x, e.y
+            e.speed = SETTINGS['enemy_speed']
+            if not e.alive:
+                # death animation update
+                e.death_time += 1
+        # enemies not in the plan keep their position this tick; only near ones can reach the player
+        for e, ticks in ai_lod.plan(enemies, player.x, player.y, SETTINGS['ai_budget']):
+            e.update(player, enemies, enemy_grid, ticks)
+            # enemy-player collision
+            if e.alive:
+                dx = e.x - player.x
+                dy = e.y - player.y
+                if (dx*dx + dy*dy) <= (10 + 6) ** 2:
+                    enemy_touch_player(e)
+            # keep the grid in step so later enemies see this one's new position
+            enemy_grid.update(e)
+
+def update_enemies():
+    # update enemies and check collisions with player
+    begin_enemies()
+    finish_enemies()
+
+def update_bullets():
+    global score
+    # update bullets and collisions (bullets can destroy enemies); spent bullets are removed after the pass
+    spd = SETTINGS.get('bullet_speed', BULLET_SPEED)
+    xs, ys, prev_xs, prev_ys = bullets.x, bullets.y, bullets.prev_x, bullets.prev_y
+    dxs, dys, trail, ids = bullets.dx, bullets.dy, bullets.trail, bullets.ids
+    for i in range(len(bullets)):
+        prev_xs[i] = xs[i]
+        prev_ys[i] = ys[i]
+        xs[i] += dxs[i] * spd
+        ys[i] += dys[i] * spd
+        # add trail particles
+        trail[i] += 1
+        if trail[i] % 4 == 0:
+            # fewer trail particles and in a different color so they don't mask the bullet core
+            make_particles(xs[i], ys[i], ocean_accent, n=1)
+        # check collision with enemies along the bullet's path, including a step that leaves the world
+        e = bullet_first_hit(bullets.row(ids[i]))
+        if e is not None:
+            e.alive = False
+            e.death_time = 0  # start death animation
+            # reward player
+            score += 5
+            # cooler particle effect with more particles
+            make_particles(e.x, e.y, e.color, n=20)
+            # random pickup drop
+            r = random.random()
+            if r < 0.35:
+                spawn_pickup(e.x, e.y, 'coin')
+            elif r < 0.7:
+                spawn_pickup(e.x, e.y, 'ammo')
+            else:
+                spawn_pickup(e.x, e.y, 'health')
+            bullets.kill(ids[i])
+        # remove out-of-world bullets once their last step has been tested
+        elif xs[i] < 0 or xs[i] > WORLD_WIDTH or ys[i] < 0 or ys[i] > WORLD_HEIGHT:
+            bullets.kill(ids[i])
+    bullets.flush()
+
+def update_pickups():
+    global score, AMMO
+    # update pickups; expired and consumed ones are removed after the pass
+    xs, ys, ttl, picked, size, ids = pickups.x, pickups.y, pickups.ttl, pickups.picked, pickups.size, pickups.ids
+    for i in range(len(pickups)):
+        ttl[i] -= 1
+        if ttl[i] <= 0:
+            pickups.kill(ids[i])
+            continue
+        # magnet effect: pull pickups gently toward player when nearby
+        if not picked[i]:
+            dxm = player.x - xs[i]
+            dym = player.y - ys[i]
+            mdist = (dxm*dxm + dym*dym) ** 0.5
+            if mdist < MAGNET_RADIUS and mdist > 0:
+                xs[i] += (dxm / mdist) * (MAGNET_STRENGTH * mdist)
+                ys[i] += (dym / mdist) * (MAGNET_STRENGTH * mdist)
+        kind = pickups.kind[i]
+        # if already picked, shrink until consumed
+        if picked[i]:
+            size[i] = max(0, size[i] - pickups.shrink_rate[i])
+            # small particles while shrinking
+            if random.random() < 0.25:
+                make_particles(xs[i] + random.uniform(-4,4), ys[i] + random.uniform(-4,4), pickup_color(kind), n=1)
+            if size[i] <= 0:
+                # apply pickup effect when shrink completes
+                if kind == 'coin':
+                    score += 10
+                    spawn_popup('+10', xs[i], ys[i] - 8, foam)
+                elif kind == 'ammo':
+                    AMMO = min(MAX_AMMO, AMMO + max(3, MAX_AMMO // 2))
+                    spawn_popup('+Ammo', xs[i], ys[i] - 8, green)
+                elif kind == 'health':
+                    player.hp = min(player.max_hp, player.hp + 2)
+                    spawn_popup('+HP', xs[i], ys[i] - 8, red)
+                pickups.kill(ids[i])
+        else:
+            # pickup by player (initiate shrink instead of immediate remove)
+            dx = xs[i] - player.x
+            dy = ys[i] - player.y
+            if (dx*dx + dy*dy) <= (10 + 6) ** 2:
+                picked[i] = True
+    pickups.flush()
+
+def update_popups():
+    # floating popups
+    ys, life, vy = popups.y, popups.life, popups.vy
+    for i in range(len(popups)):
+        ys[i] += vy[i]
+        life[i] -= 1
+        if life[i] <= 0:
+            popups.kill(popups.ids[i])
+    popups.flush()
+
+def update_waves():
+    # player death, dead enemy cleanup and wave progression
+    global scene, wave, wave_active, wave_timer
+    # check player death
+    if player.hp <= 0:
+        # reset to menu and heal player
+        scene = 'menu'
+        player.hp = player.max_hp
+    # remove dead enemies after death animation completes
+    if swarm_mode:
+        enemies[:] = swarm.compact()
+    else:
+        # one compaction pass instead of a list.remove per finished enemy
+        enemies[:] = [e for e in enemies if e.alive or e.death_time < e.death_duration]
+
+    # wave management: if all enemies are dead, schedule/advance wave
+    alive = swarm.any_alive() if swarm_mode else any(e.alive for e in enemies)
+    now = sim_time
+    if not alive and wave_active:
+        # wave cleared
+        wave_active = False
+        wave_timer = now + WAVE_DELAY
+    if not wave_active and now >= wave_timer:
+        # advance to next wave
+        wave += 1
+        spawn_enemies(SETTINGS['enemy_count'] * wave)
+        wave_active = True
+
+def simulate_tick(keys):
+    """Advance the game scene by one fixed simulation step"""
+    global sim_time
+    sim_time += SIM_DT
+    profiler.timed('player', update_player, keys)
+    # particles and popups neither read nor move enemies, so they run while a swarm worker steps
+    profiler.timed('enemies', begin_enemies)
+    profiler.timed('particles', particles.step)
+    profiler.timed('popups', update_popups)
+    profiler.timed('enemies', finish_enemies)
+    profiler.timed('bullets', update_bullets)
+    profiler.timed('pickups', update_pickups)
+    profiler.timed('waves', update_waves)
+
+def draw_entities(alpha):
+    # enemies, bullets and pickups; anything outside the view is skipped before any screen math
+    if swarm_mode:
+        n = swarm.count
+        xs = swarm.prev_x[:n] + (swarm.x[:n] - swarm.prev_x[:n]) * alpha
+        ys = swarm.prev_y[:n] + (swarm.y[:n] - swarm.prev_y[:n]) * alpha
+        for slot in np.flatnonzero(culler.visible_mask(xs, ys)).tolist():
+            swarm.views[slot].draw(alpha)
+    else:
+        for e in enemies:
+            if culler.visible(*lerp_pos(e, alpha)):
+                e.draw(alpha)
+    for i in range(len(bullets)):
+        pos = lerp_pos(bullets.row(bullets.ids[i]), alpha)
+        if culler.visible(*pos):
+            draw_bullet(*pos)
+    # pickups (picked ones shrink until consumed)
+    for i in range(len(pickups)):
+        if not culler.visible(pickups.x[i], pickups.y[i]):
+            continue
+        screen_px, screen_py = world_to_screen(pickups.x[i], pickups.y[i])
+        if pickups.picked[i]:
+            sz = int(max(1, pickups.size[i]))
+        else:
+            sz = int(pickups.size[i])
+        pygame.draw.circle(display, pickup_color(pickups.kind[i]), (int(screen_px), int(screen_py)), sz)
+
+def draw_player(alpha):
+    player.draw(alpha)
+    # draw gun that follows cursor (rotated to point at mouse)
+    draw_gun(alpha)
+
+def draw_hud():
+    # show ammo, reload status and score (with progress bar)
+    now = sim_time
+    if now < reload_cooldown:
+        remaining = max(0, reload_cooldown - now)
+        progress = 1 - (remaining / RELOAD_TIME)
+        bar_w = 120
+        bar_h = 10
+        bx = 5
+        by = 25
+        pygame.draw.rect(display, ocean_med, (bx, by, bar_w, bar_h))
+        pygame.draw.rect(display, foam, (bx, by, int(bar_w * progress), bar_h))
+        reload_surf = render_text(font, "Reloading...", coral)
+        display.blit(reload_surf, (5, 25 + bar_h + 2))
+    else:
+        ammo_surf = render_text(font, f"Ammo: {AMMO} (R to reload)", foam)
+        display.blit(ammo_surf, (5, 25))
+    score_surf = render_text(font, f"Score: {score}", biolum)
+    display.blit(score_surf, (5, 45))
+    # floating popups
+    for i in range(len(popups)):
+        if not culler.visible(popups.x[i], popups.y[i]):
+            continue
+        sx, sy = world_to_screen(popups.x[i], popups.y[i])
+        txt = render_text(font, popups.text[i], popups.color[i])
+        display.blit(txt, (int(sx - txt.get_width() / 2), int(sy)))
+
+def enemy_positions():
+    # x, y and alive arrays of every enemy, dead ones included
+    if swarm_mode:
+        n = swarm.count
+        return swarm.x[:n], swarm.y[:n], swarm.alive[:n]
+    n = len(enemies)
+    xs = np.fromiter((e.x for e in enemies), float, n)
+    ys = np.fromiter((e.y for e in enemies), float, n)
+    alive = np.fromiter((e.alive for e in enemies), bool, n)
+    return xs, ys, alive
+
+class MinimapLayer:
+    """Minimap rendered into its own surface a few times a second; dots for small waves, a density view for large ones"""
+    def __init__(self, w=MINIMAP_W, h=MINIMAP_H, cell=MINIMAP_CELL):
+        self.w = w
+        self.h = h
+        self.cell = cell
+        self.surface = pygame.Surface((w, h))
+        self.next_refresh = 0.0
+        self.density = False
+
+    def refresh(self):
+        surf = self.surface
+        surf.fill(ocean_med)
+        xs, ys, alive = enemy_positions()
+        mx = (xs * (self.w / WORLD_WIDTH)).astype(int)
+        my = (ys * (self.h / WORLD_HEIGHT)).astype(int)
+        self.density = len(xs) > MINIMAP_DENSITY_THRESHOLD
+        if self.density:
+            # bin alive enemies per cell in one pass, then shade each cell from background to coral by count
+            bw, bh = -(-self.w // self.cell), -(-self.h // self.cell)
+            bx = np.clip(mx[alive] // self.cell, 0, bw - 1)
+            by = np.clip(my[alive] // self.cell, 0, bh - 1)
+            counts = np.bincount(bx * bh + by, minlength=bw * bh).reshape(bw, bh)
+            # square root so sparse cells stay visible next to the dense core
+            heat = np.sqrt(counts / max(1, counts.max()))[:, :, None]
+            pixels = np.array(ocean_med) * (1 - heat) + np.array(coral) * heat
+            cells = pygame.surfarray.make_surface(pixels.astype(np.uint8))
+            surf.blit(pygame.transform.scale(cells, (bw * self.cell, bh * self.cell)), (0, 0))
+        else:
+            for ex, ey, is_alive in zip(mx.tolist(), my.tolist(), alive.tolist()):
+                pygame.draw.circle(surf, coral if is_alive else (60,60,60), (ex, ey), 2)
+        pygame.draw.rect(surf, foam, (0, 0, self.w, self.h), 1)
+
+    def draw(self, surface, x, y):
+        # enemies at the configured rate; the player marker stays live
+        now = time.perf_counter()
+        if now >= self.next_refresh:
+            self.refresh()
+            self.next_refresh = now + 1.0 / SETTINGS.get('minimap_hz', 10)
+        surface.blit(self.surface, (x, y))
+        px = x + int(player.x * self.w / WORLD_WIDTH)
+        py = y + int(player.y * self.h / WORLD_HEIGHT)
+        pygame.draw.circle(surface, biolum, (px, py), 3)
+
+minimap = MinimapLayer()
+
+def draw_minimap():
+    minimap.draw(display, window_res[0] - MINIMAP_W - 8, 8)
+
+def draw_game(alpha):
+    """Render the game scene with moving entities interpolated alpha of the way into the current tick"""
+    culler.begin()
+    # draw tiled world background
+    profiler.timed('tiles', draw_tiles)
+    profiler.timed('entities', draw_entities, alpha)
+    profiler.timed('particle_fx', draw_particles, alpha, not paused)
+    # draw player and HUD
+    profiler.timed('entities', draw_player, alpha)
+    profiler.timed('hud', draw_hud)
+    profiler.timed('minimap', draw_minimap)
+
+    if paused:
+        # paused overlay
+        overlay = pygame.Surface((window_res[0], window_res[1]), pygame.SRCALPHA)
+        overlay.fill((5, 5, 10, 120))
+        display.blit(overlay, (0, 0))
+        pause_surf = render_text(big_font, 'PAUSED', foam)
+        display.blit(pause_surf, (window_res[0]//2 - pause_surf.get_width()//2, window_res[1]//2 - pause_surf.get_height()//2))
+
 # simple scene management: 'menu', 'settings', 'game'
 scene = 'menu'
+# scene to switch to once the loading scene has every requested asset
+loading_next = 'menu'
 
 # wave system
 wave = 1
@@ -538,12 +2528,20 @@ wave_active = False
 wave_timer = 0.0
 WAVE_DELAY = 2.5
 
+# fixed-rate simulation: speeds, TTLs and animations are all per tick. 120 Hz matches
+# the old default fps_limit, so gameplay speed is what players already know
+SIM_HZ = 120
+SIM_DT = 1.0 / SIM_HZ
+MAX_SIM_STEPS = 8  # catch-up bound per rendered frame so a slow frame can't death-spiral
+sim_accumulator = 0.0
+last_frame_time = time.perf_counter()
+
 # menu state
 menu_items = ["Start Game", "Upgrades", "Settings", "Quit"]
 menu_index = 0
 
 # settings menu state
-settings_items = ["player_speed", "enemy_count", "enemy_speed", "fps_limit"]
+settings_items = ["player_speed", "enemy_count", "enemy_speed", "fps_limit", "swarm", "minimap_hz", "ai_budget"]
 settings_index = 0
 # upgrades available in shop
 upgrades = [
@@ -552,88 +2550,705 @@ upgrades = [
     {"name": "Increase Bullet Speed", "key": "bullet_speed", "inc": 1, "cost": 12},
 ]
 upgrades_index = 0
-while running:
-    # clear screen first, then handle events, draw, and flip
-    display.fill(ocean_dark)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-        # window controls (available in all scenes)
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_F11:
-                toggle_maximize()
-            if event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
-                set_zoom(zoom_level + 0.1)
-            if event.key == pygame.K_MINUS:
-                set_zoom(zoom_level - 0.1)
-            if event.key == pygame.K_0:
-                set_zoom(1.0)
-        
-        # scroll wheel zooming (game zoom only, in game scene)
-        if event.type == pygame.MOUSEWHEEL:
-            if event.y > 0:  # scroll up = zoom in
-                game_zoom = min(3.0, game_zoom + 0.1)
-            elif event.y < 0:  # scroll down = zoom out
-                game_zoom = max(0.5, game_zoom - 0.1)
-
-        # scene-specific input
-        if scene == 'menu':
-            # keyboard navigation
+class HeldKeys:
+    """Key state indexable like pygame.key.get_pressed(), for scripted and bot input"""
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+def apply_action(action):
+    # discrete inputs from a scripted/bot source: ('shoot', world_x, world_y), ('reload',), ('shield',),
+    # ('pause',), the debug ('spawn', count) and ('view', world_w, world_h) when the view size changes
+    global paused
+    kind = action[0]
+    if kind == 'shoot':
+        try_shoot(action[1], action[2])
+    elif kind == 'reload':
+        try_reload()
+    elif kind == 'shield':
+        activate_shield()
+    elif kind == 'pause':
+        paused = not paused
+    elif kind == 'spawn':
+        spawn_enemies(action[1], append=True)
+    elif kind == 'view':
+        ai_lod.view = (action[1], action[2])
+
+def nearest_enemy(x, y):
+    # closest alive enemy and its squared distance, or (None, None)
+    if swarm_mode:
+        idx = np.flatnonzero(swarm.alive[:swarm.count])
+        if len(idx) == 0:
+            return None, None
+        d2 = (swarm.x[idx] - x) ** 2 + (swarm.y[idx] - y) ** 2
+        k = int(np.argmin(d2))
+        return swarm.views[idx[k]], float(d2[k])
+    best, best_d2 = None, None
+    for e in enemies:
+        if e.alive:
+            d2 = (e.x - x) ** 2 + (e.y - y) ** 2
+            if best_d2 is None or d2 < best_d2:
+                best, best_d2 = e, d2
+    return best, best_d2
+
+class ScriptedInput:
+    """Input source from a script {tick: (held keys, [actions])}; held keys persist until the next entry"""
+    def __init__(self, script):
+        self.script = script
+        self.keys = HeldKeys()
+
+    def poll(self, tick):
+        entry = self.script.get(tick)
+        if entry is None:
+            return self.keys, []
+        held, actions = entry
+        self.keys = HeldKeys(held)
+        return self.keys, list(actions)
+
+class ChaseBot:
+    """Deterministic stand-in player: backs away from the nearest enemy, shoots it and collects pickups"""
+    def __init__(self, keep_away=160, dead_zone=8):
+        self.keep_away = keep_away
+        self.dead_zone = dead_zone
+
+    def steer(self, dx, dy):
+        pressed = set()
+        if dx < -self.dead_zone:
+            pressed.add(pygame.K_a)
+        elif dx > self.dead_zone:
+            pressed.add(pygame.K_d)
+        if dy < -self.dead_zone:
+            pressed.add(pygame.K_w)
+        elif dy > self.dead_zone:
+            pressed.add(pygame.K_s)
+        return pressed
+
+    def poll(self, tick):
+        actions = []
+        pressed = set()
+        target, d2 = nearest_enemy(player.x, player.y)
+        if target is not None:
+            actions.append(('shoot', target.x, target.y))
+            if d2 < self.keep_away ** 2:
+                pressed = self.steer(player.x - target.x, player.y - target.y)
+        if not pressed and pickups:
+            pressed = self.steer(pickups.x[0] - player.x, pickups.y[0] - player.y)
+        if AMMO == 0:
+            actions.append(('reload',))
+        return HeldKeys(pressed), actions
+
+# held keys the simulation reads, stored as one bit each per recorded tick
+RECORDED_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s)
+RECORDING_MAGIC = b'OITCREC'
+RECORDING_VERSION = 1
+# action kind -> (code, struct format of its arguments)
+RECORDED_ACTIONS = {'shoot': (0, '<dd'), 'reload': (1, ''), 'shield': (2, ''), 'pause': (3, ''), 'spawn': (4, '<H'),
+                    'view': (5, '<dd')}
+
+class InputRecording:
+    """Seed, settings and per-tick input of one game: held keys, mouse position and the actions taken before each tick"""
+    def __init__(self, seed, settings, ticks=None):
+        self.seed = seed
+        self.settings = dict(settings)
+        self.ticks = ticks if ticks is not None else []  # (key bits, (mouse x, mouse y), actions)
+        self.pending = []
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def record_action(self, action):
+        # actions land on the next recorded tick, which is where the live game applied them
+        self.pending.append(action)
+
+    def record_tick(self, keys, mouse):
+        bits = 0
+        for bit, key in enumerate(RECORDED_KEYS):
+            if keys[key]:
+                bits |= 1 << bit
+        self.ticks.append((bits, mouse, self.pending))
+        self.pending = []
+
+    def save(self, path):
+        # header with seed and settings as JSON, then the ticks packed and zlib-compressed
+        settings = json.dumps(self.settings, sort_keys=True).encode()
+        body = bytearray()
+        for bits, (mx, my), actions in self.ticks:
+            body += struct.pack('<HhhB', bits, mx, my, len(actions))
+            for kind, *args in actions:
+                code, fmt = RECORDED_ACTIONS[kind]
+                body += struct.pack('<B', code)
+                if fmt:
+                    body += struct.pack(fmt, *args)
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<7sBIII', RECORDING_MAGIC, RECORDING_VERSION, self.seed, len(self.ticks), len(settings)))
+            f.write(settings)
+            f.write(zlib.compress(bytes(body), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, seed, count, settings_len = struct.unpack_from('<7sBIII', data)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{path}: not a version {RECORDING_VERSION} input recording")
+        offset = struct.calcsize('<7sBIII')
+        settings = json.loads(data[offset:offset + settings_len])
+        body = zlib.decompress(data[offset + settings_len:])
+        kinds = {code: (kind, fmt) for kind, (code, fmt) in RECORDED_ACTIONS.items()}
+        ticks = []
+        pos = 0
+        for _ in range(count):
+            bits, mx, my, n = struct.unpack_from('<HhhB', body, pos)
+            pos += struct.calcsize('<HhhB')
+            actions = []
+            for _ in range(n):
+                kind, fmt = kinds[body[pos]]
+                pos += 1
+                args = ()
+                if fmt:
+                    args = struct.unpack_from(fmt, body, pos)
+                    pos += struct.calcsize(fmt)
+                actions.append((kind,) + args)
+            ticks.append((bits, (mx, my), actions))
+        return cls(seed, settings, ticks)
+
+class ReplaySource:
+    """Feeds a recording back tick by tick, in the same poll interface as ChaseBot"""
+    def __init__(self, recording):
+        self.recording = recording
+
+    def poll(self, tick):
+        bits, _, actions = self.recording.ticks[tick]
+        return HeldKeys(key for bit, key in enumerate(RECORDED_KEYS) if bits >> bit & 1), actions
+
+class RecordingSource:
+    """Passes another source's input through while recording it, as the live game records the player's"""
+    def __init__(self, source, recording):
+        self.source = source
+        self.recording = recording
+
+    def poll(self, tick):
+        keys, actions = self.source.poll(tick)
+        for action in actions:
+            self.recording.record_action(action)
+        self.recording.record_tick(keys, (0, 0))
+        return keys, actions
+
+SNAPSHOT_MAGIC = b'OITCSAV'
+SNAPSHOT_VERSION = 2
+# what reading a snapshot from another version, or a truncated or corrupt file, raises
+SNAPSHOT_ERRORS = (ValueError, IndexError, struct.error, zlib.error)
+QUICKSAVE_PATH = 'quicksave.sav'
+PICKUP_KINDS = ('coin', 'ammo', 'health')
+
+class SnapshotWriter:
+    """Packs snapshot fields in order: struct values, typed array columns and length-prefixed blobs"""
+    def __init__(self):
+        self.parts = []
+
+    def fields(self, fmt, *values):
+        self.parts.append(struct.pack(fmt, *values))
+
+    def column(self, values, dtype):
+        self.parts.append(np.asarray(values, dtype).tobytes())
+
+    def blob(self, data):
+        self.fields('<I', len(data))
+        self.parts.append(data)
+
+    def getvalue(self):
+        return b''.join(self.parts)
+
+class SnapshotReader:
+    """Reads back what a SnapshotWriter packed, in the same order"""
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def fields(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values
+
+    def column(self, count, dtype, width=1):
+        dtype = np.dtype(dtype)
+        arr = np.frombuffer(self.data, dtype, count * width, self.pos)
+        self.pos += arr.nbytes
+        return arr if width == 1 else arr.reshape(count, width)
+
+    def blob(self):
+        (size,) = self.fields('<I')
+        self.pos += size
+        return self.data[self.pos - size:self.pos]
+
+# enemy columns shared by both backends; the rest of an enemy (colour, sprite, AI slot) is per view
+ENEMY_COLUMNS = (('x', '<f8'), ('y', '<f8'), ('prev_x', '<f8'), ('prev_y', '<f8'), ('speed', '<f8'),
+                 ('alive', '?'), ('death_time', '<i4'))
+BULLET_COLUMNS = (('x', '<f8'), ('y', '<f8'), ('prev_x', '<f8'), ('prev_y', '<f8'), ('dx', '<f8'), ('dy', '<f8'), ('trail', '<i4'))
+# particles are cosmetic, so single precision is enough for them
+PARTICLE_COLUMNS = (('x', '<f4'), ('y', '<f4'), ('vx', '<f4'), ('vy', '<f4'), ('size', '<f4'), ('life', '<i4'), ('max_life', '<i4'))
+
+def snapshot_state():
+    """The running game as a versioned, zlib-compressed binary snapshot of packed columns"""
+    w = SnapshotWriter()
+    w.blob(json.dumps(SETTINGS, sort_keys=True).encode())
+    # timers are written as time left, so a restored game counts them down from its own clock
+    w.fields('<dIiii????dddd', sim_time, wave, score, AMMO, MAX_AMMO, wave_active, shield_active, paused, swarm_mode,
+             max(0.0, wave_timer - sim_time), max(0.0, shoot_cooldown - sim_time),
+             max(0.0, reload_cooldown - sim_time), max(0.0, shield_end_time - sim_time))
+    w.fields('<ddddiiddd', player.x, player.y, player.prev_x, player.prev_y, player.hp, player.max_hp,
+             camera_x, camera_y, game_zoom)
+    _, rng_words, rng_gauss = random.getstate()
+    w.column(rng_words, '<u4')
+    w.fields('<?d', rng_gauss is not None, rng_gauss or 0.0)
+    w.fields('<qq', ai_lod.tick, ai_lod.cursor)
+    w.column(ai_lod.totals, '<q')
+    w.fields('<q', ai_lod.total_deferred)
+
+    views = swarm.views if swarm_mode else enemies
+    w.fields('<I', len(views))
+    for name, dtype in ENEMY_COLUMNS:
+        w.column(getattr(swarm, name)[:swarm.count] if swarm_mode else [getattr(e, name) for e in views], dtype)
+    sprite_ids = {id(sprite): i for i, sprite in enumerate(enemy_sprites)}
+    w.column([e.color[:3] for e in views], 'u1')
+    w.column([sprite_ids.get(id(e.sprite), -1) for e in views], '<i2')
+    w.column([-1 if e.ai_tick is None else e.ai_tick for e in views], '<i8')
+    w.column([e.ai_slot for e in views], '<i4')
+
+    w.fields('<I', len(bullets))
+    for name, dtype in BULLET_COLUMNS:
+        w.column(getattr(bullets, name), dtype)
+
+    w.fields('<I', len(pickups))
+    for name in ('x', 'y', 'size', 'shrink_rate'):
+        w.column(getattr(pickups, name), '<f8')
+    w.column([PICKUP_KINDS.index(kind) for kind in pickups.kind], 'u1')
+    w.column(pickups.ttl, '<i4')
+    w.column(pickups.picked, '?')
+
+    w.fields('<I', len(popups))
+    w.blob('\0'.join(popups.text).encode())
+    for name in ('x', 'y', 'vy'):
+        w.column(getattr(popups, name), '<f8')
+    w.column(popups.life, '<i4')
+    w.column([c[:3] for c in popups.color], 'u1')
+
+    n = particles.count
+    w.fields('<I', n)
+    for name, dtype in PARTICLE_COLUMNS:
+        w.column(getattr(particles, name)[:n], dtype)
+    w.column(particles.color[:n], 'u1')
+
+    body = w.getvalue()
+    return struct.pack('<7sBI', SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(body)) + zlib.compress(body, 1)
+
+def read_snapshot(data):
+    """Parse a snapshot from snapshot_state into plain values, without touching the running game"""
+    magic, version, size = struct.unpack_from('<7sBI', data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"not a version {SNAPSHOT_VERSION} snapshot")
+    r = SnapshotReader(zlib.decompress(data[struct.calcsize('<7sBI'):]))
+    snap = {'settings': json.loads(r.blob())}
+    snap['globals'] = r.fields('<dIiii????dddd')
+    snap['player'] = r.fields('<ddddiiddd')
+    snap['rng_words'] = tuple(r.column(625, '<u4').tolist())
+    snap['rng_gauss'] = r.fields('<?d')
+    snap['ai_lod'] = r.fields('<qq')
+    snap['ai_totals'] = r.column(len(ai_lod.bands), '<q').tolist()
+    (snap['ai_total_deferred'],) = r.fields('<q')
+
+    (n,) = r.fields('<I')
+    snap['enemies'] = {name: r.column(n, dtype).copy() for name, dtype in ENEMY_COLUMNS}
+    snap['enemy_views'] = (r.column(n, 'u1', 3).tolist(), r.column(n, '<i2').tolist(),
+                           r.column(n, '<i8').tolist(), r.column(n, '<i4').tolist())
+
+    (n,) = r.fields('<I')
+    snap['bullets'] = [r.column(n, dtype).tolist() for _, dtype in BULLET_COLUMNS]
+
+    (n,) = r.fields('<I')
+    xs, ys, sizes, rates = (r.column(n, '<f8').tolist() for _ in range(4))
+    kinds = [PICKUP_KINDS[kind] for kind in r.column(n, 'u1').tolist()]
+    snap['pickups'] = (xs, ys, sizes, rates, kinds, r.column(n, '<i4').tolist(), r.column(n, '?').tolist())
+
+    (n,) = r.fields('<I')
+    # the text blob is written even when there are no popups
+    text = r.blob().decode()
+    texts = text.split('\0') if n else []
+    xs, ys, vys = (r.column(n, '<f8').tolist() for _ in range(3))
+    snap['popups'] = (texts, xs, ys, vys, r.column(n, '<i4').tolist(), r.column(n, 'u1', 3).tolist())
+    if len(texts) != n:
+        raise ValueError("popup texts don't match the popup count")
+
+    (n,) = r.fields('<I')
+    snap['particles'] = {name: r.column(n, dtype).copy() for name, dtype in PARTICLE_COLUMNS}
+    snap['particles']['color'] = r.column(n, 'u1', 3).copy()
+    if n > particles.capacity:
+        raise ValueError(f"{n} particles don't fit the pool")
+    if r.pos != len(r.data):
+        raise ValueError("trailing data after the snapshot")
+    return snap
+
+def restore_state(data):
+    """Replace the running game with a snapshot from snapshot_state; one that doesn't parse leaves the game as it was"""
+    global wave, score, AMMO, MAX_AMMO, wave_active, shield_active, paused, swarm_mode, PLAYER_SPEED, scene
+    global sim_time, wave_timer, shoot_cooldown, reload_cooldown, shield_end_time, camera_x, camera_y, game_zoom
+    # parse everything first, so a bad or truncated snapshot raises before any state is replaced
+    snap = read_snapshot(data)
+    load_sprites()
+    SETTINGS.update(snap['settings'])
+    PLAYER_SPEED = SETTINGS['player_speed']
+    (sim_time, wave, score, AMMO, MAX_AMMO, wave_active, shield_active, paused, swarm_mode,
+     wave_left, shoot_left, reload_left, shield_left) = snap['globals']
+    wave_timer = sim_time + wave_left
+    shoot_cooldown = sim_time + shoot_left
+    reload_cooldown = sim_time + reload_left
+    shield_end_time = sim_time + shield_left
+    (player.x, player.y, player.prev_x, player.prev_y, player.hp, player.max_hp,
+     camera_x, camera_y, game_zoom) = snap['player']
+    ai_lod.tick, ai_lod.cursor = snap['ai_lod']
+    # the running totals behind the ai_updates summary carry over; the last tick's counts belong to the old game
+    ai_lod.totals = snap['ai_totals']
+    ai_lod.total_deferred = snap['ai_total_deferred']
+    ai_lod.processed = [0] * len(ai_lod.bands)
+    ai_lod.deferred = 0
+
+    columns = snap['enemies']
+    colors, sprites, ai_ticks, ai_slots = snap['enemy_views']
+    n = len(colors)
+    enemies.clear()
+    if swarm_mode:
+        select_swarm_backend(SETTINGS.get('swarm_worker', False))
+        swarm.clear()
+    xs, ys, speeds = columns['x'].tolist(), columns['y'].tolist(), columns['speed'].tolist()
+    for i in range(n):
+        e = swarm.add(xs[i], ys[i], speeds[i]) if swarm_mode else Enemy(xs[i], ys[i], speeds[i])
+        e.color = tuple(colors[i])
+        e.sprite = enemy_sprites[sprites[i]] if 0 <= sprites[i] < len(enemy_sprites) else None
+        e.ai_tick = None if ai_ticks[i] < 0 else ai_ticks[i]
+        e.ai_slot = ai_slots[i]
+        enemies.append(e)
+    if swarm_mode:
+        for name, _ in ENEMY_COLUMNS:
+            getattr(swarm, name)[:n] = columns[name]
+    else:
+        for name in ('prev_x', 'prev_y', 'alive', 'death_time'):
+            for e, value in zip(enemies, columns[name].tolist()):
+                setattr(e, name, value)
+
+    bullets.clear()
+    for row in zip(*snap['bullets']):
+        bullets.spawn(**dict(zip((name for name, _ in BULLET_COLUMNS), row)))
+
+    xs, ys, sizes, rates, kinds, ttls, picked = snap['pickups']
+    pickups.clear()
+    for i in range(len(xs)):
+        pickups.spawn(x=xs[i], y=ys[i], kind=kinds[i], ttl=ttls[i], picked=picked[i], size=sizes[i], shrink_rate=rates[i])
+
+    texts, xs, ys, vys, lives, colors = snap['popups']
+    popups.clear()
+    for i in range(len(texts)):
+        spawn_popup(texts[i], xs[i], ys[i], tuple(colors[i]), lives[i], vys[i])
+
+    columns = snap['particles']
+    n = particles.count = len(columns['x'])
+    for name, column in columns.items():
+        getattr(particles, name)[:n] = column
+
+    # last, since creating the enemies above drew colours from the generator
+    has_gauss, gauss = snap['rng_gauss']
+    random.setstate((3, snap['rng_words'], gauss if has_gauss else None))
+    minimap.next_refresh = 0.0
+    scene = 'game'
+
+def save_snapshot(path):
+    data = snapshot_state()
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+def load_snapshot(path):
+    with open(path, 'rb') as f:
+        restore_state(f.read())
+
+# input of the game being played, while recording
+recording = None
+
+def begin_game(record_path=None):
+    # start a game from the menu; when recording, seed it so the recording can reproduce it
+    global recording
+    if record_path is None:
+        start_game()
+        return
+    seed = random.getrandbits(32)
+    recording = InputRecording(seed, SETTINGS)
+    start_game(seed)
+
+def stop_recording(path):
+    # write the recorded game out once it has ended (or the window closes mid-game)
+    global recording
+    if recording is not None:
+        recording.save(path)
+        recording = None
+
+def game_action(action):
+    # discrete input from the player: applied right away, and kept for the replay when recording
+    if recording is not None:
+        recording.record_action(action)
+    apply_action(action)
+
+def run_headless(seed=0, ticks=None, source=None, settings=None):
+    """Simulate the game scene from a seed without rendering, as fast as the CPU allows; returns a summary"""
+    if settings:
+        SETTINGS.update(settings)
+    if ticks is None:
+        ticks = SIM_HZ * 60
+    if source is None:
+        source = ChaseBot()
+    start_game(seed)
+    started = time.perf_counter()
+    tick = 0
+    while tick < ticks and scene == 'game':
+        keys, actions = source.poll(tick)
+        for action in actions:
+            apply_action(action)
+        simulate_tick(keys)
+        tick += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'seed': seed,
+        'ticks': tick,
+        'died': scene != 'game',
+        'seconds': round(elapsed, 3),
+        'ticks_per_second': round(tick / elapsed) if elapsed > 0 else 0,
+        **game_summary(),
+    }
+
+def check_replay(seed=0, ticks=None, games=2, path='check.rec'):
+    """Record bot games back to back in this process, replay the last one in a fresh process; returns the differing summary lines"""
+    for i in range(games):
+        recorded = InputRecording(seed + i, SETTINGS)
+        live = run_headless(seed + i, ticks, RecordingSource(ChaseBot(), recorded))
+    recorded.save(path)
+    try:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--headless', '--replay', path],
+                             capture_output=True, text=True, check=True).stdout.splitlines()
+    finally:
+        os.remove(path)
+    expected = [f"{key}: {value}" for key, value in live.items() if key in game_summary()]
+    return [line for line in expected if line not in out]
+
+def game_summary():
+    # end state of a run, for comparing runs of the same inputs
+    return {
+        'wave': wave,
+        'score': score,
+        'hp': player.hp,
+        'enemies': len(enemies),
+        'bullets': len(bullets),
+        'pickups': len(pickups),
+        'particles': len(particles),
+        'player': (round(player.x, 3), round(player.y, 3)),
+        'ai_updates': dict(zip(ai_lod.names + ('deferred',), ai_lod.totals + [ai_lod.total_deferred])),
+    }
+
+# scenes with no animation: drawn from input-driven state only
+IDLE_SCENES = ('menu', 'settings', 'upgrades')
+IDLE_TIMEOUT_MS = 250
+
+def text_item(fnt, text, color, pos, center=False):
+    # drawable (key, surface, pos, blend flags) for a line of text; key changes when the content does
+    surf = render_text(fnt, text, color)
+    x, y = pos
+    if center:
+        x -= surf.get_width() // 2
+    return ((id(fnt), text, tuple(color)), surf, (x, y), 0)
+
+def glow_item(pos, radius, color, intensity):
+    key = glow_cache.key(radius, color, intensity)
+    r = key[0]
+    return (('glow',) + key, glow_cache.get(key), (int(pos[0]) - r, int(pos[1]) - r), pygame.BLEND_RGB_ADD)
+
+def blit_item(surface, item):
+    _, surf, pos, flags = item
+    surface.blit(surf, pos, special_flags=flags)
+
+def draw_game_frame(alpha, steps):
+    # the game scene: camera first, since everything is drawn relative to it
+    update_camera(*lerp_pos(player, alpha), steps=steps)
+    draw_game(alpha)
+    for item in overlay_text_items():
+        blit_item(display, item)
+
+def frame_counts():
+    # per-frame counters for the profiler, in FrameProfiler.COUNTS order
+    return (len(enemies), len(bullets), len(particles), len(pickups), len(popups), culler.drawn, culler.culled,
+            *ai_lod.processed, ai_lod.deferred)
+
+def overlay_text_items():
+    # common: FPS display, wave info and debug overlay (helpful when player seems invisible)
+    items = [text_item(font, f"FPS: {int(clock.get_fps())}", ocean_accent, (5, 5))]
+    if scene == 'game':
+        items.append(text_item(font, f"Wave: {wave}", biolum, (window_res[0]-120, 5)))
+    items.append(text_item(font, f"Scene: {scene}  Player: {int(player.x)},{int(player.y)}  HP:{player.hp}", (200,200,200), (10, window_res[1]-24)))
+    return items
+
+def static_scene_items():
+    # everything the menu, settings and upgrades scenes draw, in draw order
+    items = []
+    cx = window_res[0] // 2
+    if scene == 'menu':
+        title = text_item(title_font, window_title, biolum, (cx, 50), center=True)
+        items.append(title)
+        items.append(glow_item((cx, 50 + title[1].get_height()//2), 80, biolum, 0.15))
+        for i, item in enumerate(menu_items):
+            color = biolum if i == menu_index else foam
+            items.append(text_item(font, item, color, (cx, 150 + i*30), center=True))
+    elif scene == 'settings':
+        items.append(text_item(settings_font, 'Settings', biolum, (cx, 40), center=True))
+        for i, key in enumerate(settings_items):
+            color = biolum if i == settings_index else foam
+            items.append(text_item(font, f"{key}: {SETTINGS[key]}", color, (100, 120 + i*30)))
+    elif scene == 'upgrades':
+        items.append(text_item(big_font, 'Upgrades', biolum, (cx, 40), center=True))
+        for i, up in enumerate(upgrades):
+            label = f"{up['name']}  -  Cost: {up['cost']}"
+            color = biolum if i == upgrades_index else foam
+            items.append(text_item(font, label, color, (120, 120 + i*40)))
+        # show player score as currency
+        items.append(text_item(font, f"Coins: {score}", biolum, (window_res[0]-120, 20)))
+    return items + overlay_text_items()
+
+class StaticSceneView:
+    """Remembers what a static scene last drew so only changed regions are redrawn and presented"""
+    def __init__(self, background):
+        self.background = background
+        self.size = None
+        self.items = None
+        self.rects = None
+
+    def invalidate(self):
+        self.items = None
+
+    def present(self, surface, items):
+        rects = [pygame.Rect(pos, surf.get_size()) for _, surf, pos, _ in items]
+        if self.items is None or self.size != surface.get_size():
+            # first frame of the scene or a resized window: draw and present everything
+            surface.fill(self.background)
+            for item in items:
+                blit_item(surface, item)
+            pygame.display.flip()
+        else:
+            dirty = []
+            for i in range(max(len(items), len(self.items))):
+                old = self.items[i] if i < len(self.items) else None
+                new = items[i] if i < len(items) else None
+                if old is None or new is None or old[0] != new[0] or old[2] != new[2]:
+                    if old is not None:
+                        dirty.append(self.rects[i])
+                    if new is not None:
+                        dirty.append(rects[i])
+            for area in dirty:
+                # repaint the area from scratch with every item that overlaps it
+                surface.set_clip(area)
+                surface.fill(self.background, area)
+                for item, rect in zip(items, rects):
+                    if rect.colliderect(area):
+                        blit_item(surface, item)
+            surface.set_clip(None)
+            if dirty:
+                pygame.display.update(dirty)
+        self.size = surface.get_size()
+        self.items = items
+        self.rects = rects
+
+static_view = StaticSceneView(ocean_dark)
+
+def begin_loading(next_scene):
+    # show the loading scene while the loader thread works through what the next scene needs
+    global scene, loading_next
+    request_assets()
+    loading_next = next_scene
+    scene = 'loading'
+
+def draw_loading():
+    # a progress bar and nothing else, so this scene never waits on an asset itself
+    w, h = 320, 12
+    x = (window_res[0] - w) // 2
+    y = window_res[1] // 2
+    pygame.draw.rect(display, ocean_light, (x - 3, y - 3, w + 6, h + 6), 1)
+    pygame.draw.rect(display, biolum, (x, y, int(w * loader.progress()), h))
+
+def run_game(startup_report=False, record_path=None):
+    """Interactive loop: events, fixed-step simulation and rendering until the window closes"""
+    global game_zoom, scene, menu_index, settings_index, upgrades_index, score, PLAYER_SPEED, MAX_AMMO
+    global sim_accumulator, last_frame_time
+    begin_loading(scene)
+    running = True
+    while running:
+        # handle events, simulate, then draw and present
+        profiler.begin_frame()
+        if scene in IDLE_SCENES and not profiler.enabled:
+            # static scenes sleep until input arrives (or the idle timeout) instead of spinning at fps_limit
+            first = pygame.event.wait(IDLE_TIMEOUT_MS)
+            events = [] if first.type == pygame.NOEVENT else [first]
+            events += pygame.event.get()
+        else:
+            events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                stop_recording(record_path)
+                pygame.quit()
+                sys.exit()
+
+            # window controls (available in all scenes)
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    menu_index = (menu_index - 1) % len(menu_items)
-                if event.key == pygame.K_DOWN:
-                    menu_index = (menu_index + 1) % len(menu_items)
-                if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                    choice = menu_items[menu_index]
-                    if choice == 'Start Game':
-                        # apply settings
-                        PLAYER_SPEED = SETTINGS['player_speed']
-                        wave = 1
-                        wave_active = True
-                        spawn_enemies(SETTINGS['enemy_count'] * wave)
-                        bullets.clear()
-                        AMMO = SETTINGS.get('max_ammo', 10)
-                        MAX_AMMO = SETTINGS.get('max_ammo', 10)
-                        score = 0
-                        player.x, player.y = WORLD_WIDTH / 2, WORLD_HEIGHT / 2
-                        scene = 'game'
-                    elif choice == 'Upgrades':
-                        scene = 'upgrades'
-                    elif choice == 'Settings':
-                        scene = 'settings'
-                    elif choice == 'Quit':
-                        pygame.quit()
-                        sys.exit()
-            # mouse click support for menu buttons
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mx, my = pygame.mouse.get_pos()
-                for i, item in enumerate(menu_items):
-                    w, h = font.size(item)
-                    bx = window_res[0]//2 - w//2
-                    by = 150 + i*30
-                    rect = pygame.Rect(bx - 8, by - 4, w + 16, h + 8)
-                    if rect.collidepoint(mx, my):
-                        choice = item
+                if event.key == pygame.K_F11:
+                    toggle_maximize()
+                if event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
+                    set_zoom(zoom_level + 0.1)
+                if event.key == pygame.K_MINUS:
+                    set_zoom(zoom_level - 0.1)
+                if event.key == pygame.K_0:
+                    set_zoom(1.0)
+                # frame profiler: F3 toggles the overlay, F4 dumps the recorded frames to CSV
+                if event.key == pygame.K_F3:
+                    profiler.enabled = not profiler.enabled
+                if event.key == pygame.K_F4 and profiler.frame:
+                    profile_path = time.strftime('profile_%Y%m%d_%H%M%S.csv')
+                    rows = profiler.dump_csv(profile_path)
+                    spawn_popup(f'{rows} frames -> {profile_path}', player.x, player.y - 40, foam, life=120, vy=-0.2)
+                # quick load from any scene; it replaces the game, so a recording of it ends here
+                if event.key == pygame.K_F9 and os.path.exists(QUICKSAVE_PATH):
+                    try:
+                        load_snapshot(QUICKSAVE_PATH)
+                    except SNAPSHOT_ERRORS:
+                        # an old or damaged save: keep playing the current game
+                        spawn_popup('Save incompatible', player.x, player.y - 40, red, life=120, vy=-0.2)
+                    else:
+                        stop_recording(record_path)
+                        spawn_popup('Loaded', player.x, player.y - 40, foam, life=90, vy=-0.2)
+
+            # scroll wheel zooming (game zoom only, in game scene)
+            if event.type == pygame.MOUSEWHEEL:
+                if event.y > 0:  # scroll up = zoom in
+                    game_zoom = min(3.0, game_zoom + 0.1)
+                elif event.y < 0:  # scroll down = zoom out
+                    game_zoom = max(0.5, game_zoom - 0.1)
+
+            # scene-specific input
+            if scene == 'menu':
+                # keyboard navigation
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_UP:
+                        menu_index = (menu_index - 1) % len(menu_items)
+                    if event.key == pygame.K_DOWN:
+                        menu_index = (menu_index + 1) % len(menu_items)
+                    if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
+                        choice = menu_items[menu_index]
                         if choice == 'Start Game':
-                            PLAYER_SPEED = SETTINGS['player_speed']
-                            wave = 1
-                            wave_active = True
-                            spawn_enemies(SETTINGS['enemy_count'] * wave)
-                            bullets.clear()
-                            AMMO = SETTINGS.get('max_ammo', 10)
-                            MAX_AMMO = SETTINGS.get('max_ammo', 10)
-                            score = 0
-                            player.x, player.y = WORLD_WIDTH / 2, WORLD_HEIGHT / 2
-                            # reset camera
-                            camera_x = player.x - (window_res[0] / 2) / game_zoom
-                            camera_y = player.y - (window_res[1] / 2) / game_zoom
-                            scene = 'game'
-                            camera_x = player.x - (window_res[0] / 2) / game_zoom
-                            camera_y = player.y - (window_res[1] / 2) / game_zoom
-                            scene = 'game'
+                            begin_game(record_path)
                         elif choice == 'Upgrades':
                             scene = 'upgrades'
                         elif choice == 'Settings':
@@ -641,503 +3256,290 @@ while running:
                         elif choice == 'Quit':
                             pygame.quit()
                             sys.exit()
+                # mouse click support for menu buttons
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    mx, my = pygame.mouse.get_pos()
+                    for i, item in enumerate(menu_items):
+                        w, h = font.size(item)
+                        bx = window_res[0]//2 - w//2
+                        by = 150 + i*30
+                        rect = pygame.Rect(bx - 8, by - 4, w + 16, h + 8)
+                        if rect.collidepoint(mx, my):
+                            choice = item
+                            if choice == 'Start Game':
+                                begin_game(record_path)
+                            elif choice == 'Upgrades':
+                                scene = 'upgrades'
+                            elif choice == 'Settings':
+                                scene = 'settings'
+                            elif choice == 'Quit':
+                                pygame.quit()
+                                sys.exit()
 
-        elif scene == 'settings':
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    key = settings_items[settings_index]
-                    if key == 'player_speed':
-                        SETTINGS['player_speed'] = max(1, SETTINGS['player_speed'] - 1)
-                    elif key == 'enemy_count':
-                        SETTINGS['enemy_count'] = max(1, SETTINGS['enemy_count'] - 1)
-                    elif key == 'enemy_speed':
-                        SETTINGS['enemy_speed'] = max(0.1, round(SETTINGS['enemy_speed'] - 0.1, 2))
-                    elif key == 'fps_limit':
-                        SETTINGS['fps_limit'] = max(15, SETTINGS['fps_limit'] - 5)
-                if event.key == pygame.K_RIGHT:
-                    key = settings_items[settings_index]
-                    if key == 'player_speed':
-                        SETTINGS['player_speed'] = min(20, SETTINGS['player_speed'] + 1)
-                    elif key == 'enemy_count':
-                        SETTINGS['enemy_count'] = min(50, SETTINGS['enemy_count'] + 1)
-                    elif key == 'enemy_speed':
-                        SETTINGS['enemy_speed'] = min(10.0, round(SETTINGS['enemy_speed'] + 0.1, 2))
-                    elif key == 'fps_limit':
-                        SETTINGS['fps_limit'] = min(240, SETTINGS['fps_limit'] + 5)
-                if event.key == pygame.K_UP:
-                    settings_index = (settings_index - 1) % len(settings_items)
-                if event.key == pygame.K_DOWN:
-                    settings_index = (settings_index + 1) % len(settings_items)
-                if event.key == pygame.K_ESCAPE or event.key == pygame.K_BACKSPACE:
-                    scene = 'menu'
-
-        elif scene == 'upgrades':
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    upgrades_index = (upgrades_index - 1) % len(upgrades)
-                if event.key == pygame.K_DOWN:
-                    upgrades_index = (upgrades_index + 1) % len(upgrades)
-                if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                    up = upgrades[upgrades_index]
-                    if score >= up['cost']:
-                        score -= up['cost']
-                        SETTINGS[up['key']] = SETTINGS.get(up['key'], 0) + up['inc']
-                        # apply some immediate effects
-                        if up['key'] == 'max_ammo':
-                            MAX_AMMO = SETTINGS['max_ammo']
-                        if up['key'] == 'player_speed':
-                            PLAYER_SPEED = SETTINGS['player_speed']
-                if event.key == pygame.K_ESCAPE:
-                    scene = 'menu'
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mx, my = pygame.mouse.get_pos()
-                for i, up in enumerate(upgrades):
-                    w, h = font.size(up['name'])
-                    bx = 120
-                    by = 120 + i*40
-                    rect = pygame.Rect(bx - 8, by - 4, 400, h + 8)
-                    if rect.collidepoint(mx, my):
+            elif scene == 'settings':
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_LEFT:
+                        key = settings_items[settings_index]
+                        if key == 'player_speed':
+                            SETTINGS['player_speed'] = max(1, SETTINGS['player_speed'] - 1)
+                        elif key == 'enemy_count':
+                            SETTINGS['enemy_count'] = max(1, SETTINGS['enemy_count'] - 1)
+                        elif key == 'enemy_speed':
+                            SETTINGS['enemy_speed'] = max(0.1, round(SETTINGS['enemy_speed'] - 0.1, 2))
+                        elif key == 'fps_limit':
+                            SETTINGS['fps_limit'] = max(15, SETTINGS['fps_limit'] - 5)
+                        elif key == 'swarm':
+                            SETTINGS['swarm'] = False
+                        elif key == 'minimap_hz':
+                            SETTINGS['minimap_hz'] = max(5, SETTINGS['minimap_hz'] - 5)
+                        elif key == 'ai_budget':
+                            SETTINGS['ai_budget'] = max(0, SETTINGS['ai_budget'] - 50)
+                    if event.key == pygame.K_RIGHT:
+                        key = settings_items[settings_index]
+                        if key == 'player_speed':
+                            SETTINGS['player_speed'] = min(20, SETTINGS['player_speed'] + 1)
+                        elif key == 'enemy_count':
+                            SETTINGS['enemy_count'] = min(50, SETTINGS['enemy_count'] + 1)
+                        elif key == 'enemy_speed':
+                            SETTINGS['enemy_speed'] = min(10.0, round(SETTINGS['enemy_speed'] + 0.1, 2))
+                        elif key == 'fps_limit':
+                            SETTINGS['fps_limit'] = min(240, SETTINGS['fps_limit'] + 5)
+                        elif key == 'swarm':
+                            SETTINGS['swarm'] = True
+                        elif key == 'minimap_hz':
+                            SETTINGS['minimap_hz'] = min(60, SETTINGS['minimap_hz'] + 5)
+                        elif key == 'ai_budget':
+                            SETTINGS['ai_budget'] = min(5000, SETTINGS['ai_budget'] + 50)
+                    if event.key == pygame.K_UP:
+                        settings_index = (settings_index - 1) % len(settings_items)
+                    if event.key == pygame.K_DOWN:
+                        settings_index = (settings_index + 1) % len(settings_items)
+                    if event.key == pygame.K_ESCAPE or event.key == pygame.K_BACKSPACE:
+                        scene = 'menu'
+
+            elif scene == 'upgrades':
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_UP:
+                        upgrades_index = (upgrades_index - 1) % len(upgrades)
+                    if event.key == pygame.K_DOWN:
+                        upgrades_index = (upgrades_index + 1) % len(upgrades)
+                    if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
+                        up = upgrades[upgrades_index]
                         if score >= up['cost']:
                             score -= up['cost']
                             SETTINGS[up['key']] = SETTINGS.get(up['key'], 0) + up['inc']
+                            # apply some immediate effects
                             if up['key'] == 'max_ammo':
                                 MAX_AMMO = SETTINGS['max_ammo']
                             if up['key'] == 'player_speed':
                                 PLAYER_SPEED = SETTINGS['player_speed']
+                    if event.key == pygame.K_ESCAPE:
+                        scene = 'menu'
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    mx, my = pygame.mouse.get_pos()
+                    for i, up in enumerate(upgrades):
+                        w, h = font.size(up['name'])
+                        bx = 120
+                        by = 120 + i*40
+                        rect = pygame.Rect(bx - 8, by - 4, 400, h + 8)
+                        if rect.collidepoint(mx, my):
+                            if score >= up['cost']:
+                                score -= up['cost']
+                                SETTINGS[up['key']] = SETTINGS.get(up['key'], 0) + up['inc']
+                                if up['key'] == 'max_ammo':
+                                    MAX_AMMO = SETTINGS['max_ammo']
+                                if up['key'] == 'player_speed':
+                                    PLAYER_SPEED = SETTINGS['player_speed']
 
-        elif scene == 'game':
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # left click
-                    now = time.time()
-                    # check shooting cooldown and ensure not reloading
-                    if not paused and now >= shoot_cooldown and now >= reload_cooldown:
+            elif scene == 'game':
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1:  # left click
                         mouse_x, mouse_y = pygame.mouse.get_pos()
                         # convert screen coords to world coords
-                        world_mx, world_my = screen_to_world(mouse_x, mouse_y)
-                        dir_x = world_mx - player.x
-                        dir_y = world_my - player.y
-                        length = (dir_x**2 + dir_y**2) ** 0.5
-                        if length != 0:
-                            dir_x /= length
-                            dir_y /= length
-                        # decrement ammo properly
-                        if AMMO > 0:
-                            AMMO -= 1
-                            bullets.append(Bullet(player.x, player.y, (dir_x, dir_y)))
-                            shoot_cooldown = now + SHOOT_DELAY  # set cooldown
-                        else:
-                            # out of ammo sound or feedback could go here
-                            pass
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    # reload when R pressed (with a tiny cooldown)
-                    now = time.time()
-                    if now >= reload_cooldown and AMMO < MAX_AMMO:
-                        AMMO = MAX_AMMO
-                        reload_cooldown = now + RELOAD_TIME
-                # pause toggle
-                if event.key == pygame.K_p:
-                    paused = not paused
-                # debug: spawn 20 additional enemies (append)
-                if event.key == pygame.K_2:
-                    spawn_enemies(20, append=True)
-                # shield activation
-                if event.key == pygame.K_f:
-                    now = time.time()
-                    # start shield for SHIELD_DURATION
-                    shield_end_time = now + SHIELD_DURATION
-                    shield_active = True
-
-    # handle continuous key presses for movement (only in game scene)
-    keys = pygame.key.get_pressed()
-    if scene == 'game':
-        speed = SETTINGS['player_speed']
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            player.x -= speed
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            player.x += speed
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            player.y -= speed
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            player.y += speed
-        if keys[pygame.K_ESCAPE]:
-            # return to menu
-            scene = 'menu'
-
-    # keep player in world bounds
-    player.clamp(WORLD_WIDTH, WORLD_HEIGHT)
+                        game_action(('shoot', *screen_to_world(mouse_x, mouse_y)))
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_r:
+                        # reload when R pressed
+                        game_action(('reload',))
+                    # pause toggle
+                    if event.key == pygame.K_p:
+                        game_action(('pause',))
+                    # debug: spawn 20 additional enemies (append)
+                    if event.key == pygame.K_2:
+                        game_action(('spawn', 20))
+                    # shield activation
+                    if event.key == pygame.K_f:
+                        game_action(('shield',))
+                    # quick save
+                    if event.key == pygame.K_F5:
+                        size = save_snapshot(QUICKSAVE_PATH)
+                        spawn_popup(f'Saved ({size // 1024} KB)', player.x, player.y - 40, foam, life=90, vy=-0.2)
 
-    # Scene drawing
-    if scene == 'menu':
-        # draw menu
-        title_font = pygame.font.SysFont(None, 48)
-        title = title_font.render(window_title, True, biolum)
-        display.blit(title, (window_res[0]//2 - title.get_width()//2, 50))
-        draw_glow((window_res[0]//2, 50 + title.get_height()//2), 80, biolum, 0.15)
-        for i, item in enumerate(menu_items):
-            color = biolum if i == menu_index else foam
-            it_surf = font.render(item, True, color)
-            display.blit(it_surf, (window_res[0]//2 - it_surf.get_width()//2, 150 + i*30))
+        # display-format conversion of whatever the loader thread has prepared
+        loader.pump()
+        if scene == 'loading' and loader.done():
+            startup.loaded = time.perf_counter() - startup.start
+            scene = loading_next
 
-    elif scene == 'settings':
-        title_font = pygame.font.SysFont(None, 42)
-        title = title_font.render('Settings', True, biolum)
-        display.blit(title, (window_res[0]//2 - title.get_width()//2, 40))
-        for i, key in enumerate(settings_items):
-            val = SETTINGS[key]
-            label = f"{key}: {val}"
-            color = biolum if i == settings_index else foam
-            surf = font.render(label, True, color)
-            display.blit(surf, (100, 120 + i*30))
-
-    elif scene == 'upgrades':
-        title = big_font.render('Upgrades', True, biolum)
-        display.blit(title, (window_res[0]//2 - title.get_width()//2, 40))
-        for i, up in enumerate(upgrades):
-            name = up['name']
-            cost = up['cost']
-            label = f"{name}  -  Cost: {cost}"
-            color = biolum if i == upgrades_index else foam
-            surf = font.render(label, True, color)
-            display.blit(surf, (120, 120 + i*40))
-        # show player score as currency
-        cur = font.render(f"Coins: {score}", True, biolum)
-        display.blit(cur, (window_res[0]-120, 20))
+        # continuous key presses; movement itself happens in simulate_tick
+        keys = pygame.key.get_pressed()
+        if scene == 'game' and keys[pygame.K_ESCAPE]:
+            # return to menu
+            scene = 'menu'
 
-    elif scene == 'game':
-        # update camera to follow player FIRST, before rendering anything
-        update_camera(player.x, player.y)
-        # update shield state
-        try:
-            if shield_end_time <= time.time():
-                shield_active = False
-        except Exception:
-            shield_active = False
-        
-        # draw tiled world background
-        draw_tiles()
-        
-        # paused drawing: when paused, render current scene but skip updates
-        if paused:
-            for e in enemies:
-                e.draw()
-            for b in bullets:
-                b.draw()
-            for p in pickups:
-                kind = p['kind']
-                color = (255, 220, 80) if kind == 'coin' else (120, 255, 160) if kind == 'ammo' else (255, 100, 120)
-                screen_px, screen_py = world_to_screen(p['x'], p['y'])
-                sz = int(p.get('size', 6 * game_zoom))
-                pygame.draw.circle(display, color, (int(screen_px), int(screen_py)), sz)
-            for q in particles:
-                screen_px, screen_py = world_to_screen(q['x'], q['y'])
-                alpha_ratio = q['life'] / q['max_life'] if q.get('max_life') else 1
-                fade_size = int(q.get('size', 2) * game_zoom * alpha_ratio)
-                if fade_size > 0:
-                    pygame.draw.circle(display, q['color'], (int(screen_px), int(screen_py)), fade_size)
-            # draw player, gun and HUD (static)
-            player.draw()
-            if 'gun_sprite' in globals() and gun_sprite:
-                mx, my = pygame.mouse.get_pos()
-                world_mx, world_my = screen_to_world(mx, my)
-                ang = math.degrees(math.atan2(world_my - player.y, world_mx - player.x))
-                w, h = gun_sprite.get_size()
-                w_scaled = int(w * game_zoom)
-                h_scaled = int(h * game_zoom)
-                gun_scaled = pygame.transform.scale(gun_sprite, (w_scaled, h_scaled))
-                rot = pygame.transform.rotate(gun_scaled, -ang)
-                player_screen_x, player_screen_y = world_to_screen(player.x, player.y)
-                rrect = rot.get_rect(center=(int(player_screen_x), int(player_screen_y)))
-                display.blit(rot, rrect.topleft)
-            # HUD (ammo / reload progress)
-            now = time.time()
-            if now < reload_cooldown:
-                remaining = max(0, reload_cooldown - now)
-                progress = 1 - (remaining / RELOAD_TIME)
-                bar_w = 120
-                bar_h = 10
-                bx = 5
-                by = 25
-                pygame.draw.rect(display, ocean_med, (bx, by, bar_w, bar_h))
-                pygame.draw.rect(display, foam, (bx, by, int(bar_w * progress), bar_h))
-                reload_surf = font.render("Reloading...", True, coral)
-                display.blit(reload_surf, (5, 25 + bar_h + 2))
-            else:
-                ammo_surf = font.render(f"Ammo: {AMMO} (R to reload)", True, foam)
-                display.blit(ammo_surf, (5, 25))
-            # draw popups
-            for popup in popups[:]:
-                popup['y'] += popup.get('vy', -0.4)
-                popup['life'] -= 1
-                if popup['life'] <= 0:
-                    popups.remove(popup)
-                    continue
-                sx, sy = world_to_screen(popup['x'], popup['y'])
-                alpha = max(0, int(255 * (popup['life'] / 60)))
-                txt = font.render(popup['text'], True, popup.get('color', foam))
-                display.blit(txt, (int(sx - txt.get_width() / 2), int(sy)))
-            # minimap (static)
-            map_x = window_res[0] - MINIMAP_W - 8
-            map_y = 8
-            pygame.draw.rect(display, ocean_med, (map_x, map_y, MINIMAP_W, MINIMAP_H))
-            pygame.draw.rect(display, foam, (map_x, map_y, MINIMAP_W, MINIMAP_H), 1)
-            scale_x = MINIMAP_W / WORLD_WIDTH
-            scale_y = MINIMAP_H / WORLD_HEIGHT
-            # enemies
-            for e in enemies:
-                ex = map_x + int(e.x * scale_x)
-                ey = map_y + int(e.y * scale_y)
-                pygame.draw.circle(display, coral if e.alive else (60,60,60), (ex, ey), 2)
-            # player
-            px = map_x + int(player.x * scale_x)
-            py = map_y + int(player.y * scale_y)
-            pygame.draw.circle(display, biolum, (px, py), 3)
-            # paused overlay
-            overlay = pygame.Surface((window_res[0], window_res[1]), pygame.SRCALPHA)
-            overlay.fill((5, 5, 10, 120))
-            display.blit(overlay, (0, 0))
-            pause_surf = big_font.render('PAUSED', True, foam)
-            display.blit(pause_surf, (window_res[0]//2 - pause_surf.get_width()//2, window_res[1]//2 - pause_surf.get_height()//2))
+        # fixed-step simulation: run the ticks real time calls for (bounded), then render between them
+        frame_now = time.perf_counter()
+        frame_dt = frame_now - last_frame_time
+        last_frame_time = frame_now
+        alpha = 1.0
+        if scene == 'game':
+            # zoom, F11 and window zoom all change how much of the world is on screen, which the AI keeps at full rate
+            view = (window_res[0] / game_zoom, window_res[1] / game_zoom)
+            if view != ai_lod.view:
+                game_action(('view',) + view)
+        if scene == 'game' and not paused:
+            sim_accumulator += min(frame_dt, MAX_SIM_STEPS * SIM_DT)
+            while sim_accumulator >= SIM_DT and scene == 'game':
+                if recording is not None:
+                    recording.record_tick(keys, pygame.mouse.get_pos())
+                simulate_tick(keys)
+                sim_accumulator -= SIM_DT
+            alpha = sim_accumulator / SIM_DT
         else:
-            # update/draw enemies and check collisions with player
-            for e in enemies:
-                e.speed = SETTINGS['enemy_speed']
-                if e.alive:
-                    e.update(player, enemies)
-                else:
-                    # death animation update
-                    e.death_time += 1
-                e.draw()
-                # enemy-player collision
-                if e.alive:
-                    dx = e.x - player.x
-                    dy = e.y - player.y
-                    dist_ep = (dx*dx + dy*dy) ** 0.5
-                    if (dx*dx + dy*dy) <= (10 + 6) ** 2:
-                        # if shield is active, push enemy away and prevent damage
-                        rem = max(0.0, shield_end_time - time.time()) if 'shield_end_time' in globals() else 0.0
-                        if rem > 0:
-                            # push enemy away from player a bit
-                            if dist_ep == 0:
-                                nx, ny = random.uniform(-1,1), random.uniform(-1,1)
-                            else:
-                                nx, ny = dx / dist_ep, dy / dist_ep
-                            e.x += nx * 16
-                            e.y += ny * 16
-                            # small visual feedback
-                            make_particles(e.x, e.y, e.color, n=6)
-                        else:
-                            # enemy hits player
-                            e.alive = False
-                            e.death_time = 0  # start death animation
-                            player.hp -= 1
-                            make_particles(e.x, e.y, e.color, n=12)
-                            spawn_pickup(e.x, e.y, 'coin')
-
-            # update bullets and collisions (bullets can destroy enemies)
-            for b in bullets[:]:
-                b.update()
-                # remove out-of-world bullets
-                if b.x < 0 or b.x > WORLD_WIDTH or b.y < 0 or b.y > WORLD_HEIGHT:
-                    bullets.remove(b)
-                    continue
-                # check collision with enemies
-                hit = False
-                for e in enemies:
-                    if e.alive and e.collide_with_bullet(b):
-                        e.alive = False
-                        e.death_time = 0  # start death animation
-                        # reward player
-                        score += 5
-                        # cooler particle effect with more particles
-                        make_particles(e.x, e.y, e.color, n=20)
-                        # random pickup drop
-                        r = random.random()
-                        if r < 0.35:
-                            spawn_pickup(e.x, e.y, 'coin')
-                        elif r < 0.7:
-                            spawn_pickup(e.x, e.y, 'ammo')
-                        else:
-                            spawn_pickup(e.x, e.y, 'health')
-                        if b in bullets:
-                            bullets.remove(b)
-                        hit = True
-                        break
-                if not hit and b in bullets:
-                    b.draw()
-
-            # update pickups
-            for p in pickups[:]:
-                p['ttl'] -= 1
-                if p['ttl'] <= 0:
-                    try:
-                        pickups.remove(p)
-                    except ValueError:
-                        pass
-                    continue
-                # magnet effect: pull pickups gently toward player when nearby
-                if not p.get('picked'):
-                    dxm = player.x - p['x']
-                    dym = player.y - p['y']
-                    mdist = (dxm*dxm + dym*dym) ** 0.5
-                    if mdist < MAGNET_RADIUS and mdist > 0:
-                        p['x'] += (dxm / mdist) * (MAGNET_STRENGTH * mdist)
-                        p['y'] += (dym / mdist) * (MAGNET_STRENGTH * mdist)
-                # draw pickup with shrink-on-pickup behavior
-                kind = p['kind']
-                color = (255, 220, 80) if kind == 'coin' else (120, 255, 160) if kind == 'ammo' else (255, 100, 120)
-                screen_px, screen_py = world_to_screen(p['x'], p['y'])
-                # if already picked, shrink until consumed
-                if p.get('picked'):
-                    p['size'] = max(0, p.get('size', 6 * game_zoom) - p.get('shrink_rate', 0.35))
-                    sz = int(max(1, p['size']))
-                    pygame.draw.circle(display, color, (int(screen_px), int(screen_py)), sz)
-                    # small particles while shrinking
-                    if random.random() < 0.25:
-                        make_particles(p['x'] + random.uniform(-4,4), p['y'] + random.uniform(-4,4), color, n=1)
-                    if p['size'] <= 0:
-                        # apply pickup effect when shrink completes
-                        if kind == 'coin':
-                            score += 10
-                            popups.append({'text': '+10', 'x': p['x'], 'y': p['y'] - 8, 'life': 60, 'vy': -0.6, 'color': foam})
-                        elif kind == 'ammo':
-                            AMMO = min(MAX_AMMO, AMMO + max(3, MAX_AMMO // 2))
-                            popups.append({'text': '+Ammo', 'x': p['x'], 'y': p['y'] - 8, 'life': 60, 'vy': -0.6, 'color': green})
-                        elif kind == 'health':
-                            player.hp = min(player.max_hp, player.hp + 2)
-                            popups.append({'text': '+HP', 'x': p['x'], 'y': p['y'] - 8, 'life': 60, 'vy': -0.6, 'color': red})
-                        try:
-                            pickups.remove(p)
-                        except ValueError:
-                            pass
-                else:
-                    # normal (unpicked) draw
-                    sz = int(p.get('size', 6 * game_zoom))
-                    pygame.draw.circle(display, color, (int(screen_px), int(screen_py)), sz)
-                    # pickup by player (initiate shrink instead of immediate remove)
-                    dx = p['x'] - player.x
-                    dy = p['y'] - player.y
-                    if (dx*dx + dy*dy) <= (10 + 6) ** 2:
-                        p['picked'] = True
-
-            # update particles
-            for q in particles[:]:
-                q['x'] += q['vx']
-                q['y'] += q['vy']
-                q['vy'] += 0.1
-                q['life'] -= 1
-                if q['life'] <= 0:
-                    particles.remove(q)
-                    continue
-                screen_px, screen_py = world_to_screen(q['x'], q['y'])
-                # fade out effect
-                alpha_ratio = q['life'] / q['max_life']
-                fade_size = int(q['size'] * game_zoom * alpha_ratio)
-                if fade_size > 0:
-                    pygame.draw.circle(display, q['color'], (int(screen_px), int(screen_py)), fade_size)
-                    # enhanced glow: brighter and larger (reduced intensity so bullets remain prominent)
-                    glow_radius = int(fade_size * 3.5)
-                    draw_glow((screen_px, screen_py), glow_radius, q['color'], 0.12 * alpha_ratio)
-
-        # draw player and HUD
-        player.draw()
-        # draw gun that follows cursor (rotated to point at mouse)
-        if 'gun_sprite' in globals() and gun_sprite:
-            mx, my = pygame.mouse.get_pos()
-            # convert screen to world for angle calculation
-            world_mx, world_my = screen_to_world(mx, my)
-            ang = math.degrees(math.atan2(world_my - player.y, world_mx - player.x))
-            # rotate gun so that 0deg points to the right
-            w, h = gun_sprite.get_size()
-            w_scaled = int(w * game_zoom)
-            h_scaled = int(h * game_zoom)
-            gun_scaled = pygame.transform.scale(gun_sprite, (w_scaled, h_scaled))
-            rot = pygame.transform.rotate(gun_scaled, -ang)
-            player_screen_x, player_screen_y = world_to_screen(player.x, player.y)
-            rrect = rot.get_rect(center=(int(player_screen_x), int(player_screen_y)))
-            display.blit(rot, rrect.topleft)
-        # show ammo, reload status and score (with progress bar)
-        now = time.time()
-        if now < reload_cooldown:
-            remaining = max(0, reload_cooldown - now)
-            progress = 1 - (remaining / RELOAD_TIME)
-            bar_w = 120
-            bar_h = 10
-            bx = 5
-            by = 25
-            pygame.draw.rect(display, ocean_med, (bx, by, bar_w, bar_h))
-            pygame.draw.rect(display, foam, (bx, by, int(bar_w * progress), bar_h))
-            reload_surf = font.render("Reloading...", True, coral)
-            display.blit(reload_surf, (5, 25 + bar_h + 2))
+            sim_accumulator = 0.0
+        if scene != 'game':
+            stop_recording(record_path)
+
+        # Scene drawing
+        if scene in IDLE_SCENES and not profiler.enabled:
+            # static scenes: redraw and present only the regions that changed
+            static_view.present(display, static_scene_items())
         else:
-            ammo_surf = font.render(f"Ammo: {AMMO} (R to reload)", True, foam)
-            display.blit(ammo_surf, (5, 25))
-        score_surf = font.render(f"Score: {score}", True, biolum)
-        display.blit(score_surf, (5, 45))
-        # floating popups
-        for popup in popups[:]:
-            popup['y'] += popup.get('vy', -0.4)
-            popup['life'] -= 1
-            if popup['life'] <= 0:
-                popups.remove(popup)
-                continue
-            sx, sy = world_to_screen(popup['x'], popup['y'])
-            txt = font.render(popup['text'], True, popup.get('color', foam))
-            display.blit(txt, (int(sx - txt.get_width() / 2), int(sy)))
-        # minimap
-        map_x = window_res[0] - MINIMAP_W - 8
-        map_y = 8
-        pygame.draw.rect(display, ocean_med, (map_x, map_y, MINIMAP_W, MINIMAP_H))
-        pygame.draw.rect(display, foam, (map_x, map_y, MINIMAP_W, MINIMAP_H), 1)
-        scale_x = MINIMAP_W / WORLD_WIDTH
-        scale_y = MINIMAP_H / WORLD_HEIGHT
-        for e in enemies:
-            ex = map_x + int(e.x * scale_x)
-            ey = map_y + int(e.y * scale_y)
-            pygame.draw.circle(display, coral if e.alive else (60,60,60), (ex, ey), 2)
-        px = map_x + int(player.x * scale_x)
-        py = map_y + int(player.y * scale_y)
-        pygame.draw.circle(display, biolum, (px, py), 3)
-
-        # check player death
-        if player.hp <= 0:
-            # reset to menu and heal player
-            scene = 'menu'
-            player.hp = player.max_hp
-        # remove dead enemies after death animation completes
-        for e in enemies[:]:
-            if not e.alive and e.death_time >= e.death_duration:
-                enemies.remove(e)
-        
-        # wave management: if all enemies are dead, schedule/advance wave
-        alive = any(e.alive for e in enemies)
-        now = time.time()
-        if not alive and wave_active:
-            # wave cleared
-            wave_active = False
-            wave_timer = now + WAVE_DELAY
-        if not wave_active and now >= wave_timer:
-            # advance to next wave
-            wave += 1
-            spawn_enemies(SETTINGS['enemy_count'] * wave)
-            wave_active = True
-
-    # common: FPS display and wave info
-    fps_surf = font.render(f"FPS: {int(clock.get_fps())}", True, ocean_accent)
-    display.blit(fps_surf, (5, 5))
-    if scene == 'game':
-        wave_surf = font.render(f"Wave: {wave}", True, biolum)
-        display.blit(wave_surf, (window_res[0]-120, 5))
+            static_view.invalidate()
+            display.fill(ocean_dark)
+            if scene in IDLE_SCENES:
+                for item in static_scene_items():
+                    blit_item(display, item)
+            elif scene == 'loading':
+                draw_loading()
+            elif scene == 'game':
+                draw_game_frame(alpha, frame_dt * SIM_HZ)
 
-    # debug overlay: scene and player coords (helpful when player seems invisible)
-    try:
-        debug_surf = font.render(f"Scene: {scene}  Player: {int(player.x)},{int(player.y)}  HP:{player.hp}", True, (200,200,200))
-        display.blit(debug_surf, (10, window_res[1]-24))
-    except Exception:
-        pass
+            if profiler.enabled:
+                profiler.draw(display, 8, window_res[1] - 24 - profiler.graph_h - 8)
 
-    # update the full display and cap the frame rate (from settings)
-    pygame.display.flip()
-    clock.tick(SETTINGS.get('fps_limit', 60))
+            # update the full display
+            pygame.display.flip()
+        startup.frame_presented()
+        if startup_report and startup.loaded is not None:
+            print(startup.report(), flush=True)
+            startup_report = False
+        profiler.end_frame(frame_counts())
+        # cap the frame rate (from settings)
+        clock.tick(SETTINGS.get('fps_limit', 60))
 
+def run_replay(recording, speed=0.0):
+    """Play a recording back on screen at speed x real time, or a tick per frame with no frame cap when speed is 0"""
+    SETTINGS.update(recording.settings)
+    source = ReplaySource(recording)
+    start_game(recording.seed)
+    started = last = time.perf_counter()
+    accumulator = 0.0
+    tick = frames = 0
+    running = True
+    while running and tick < len(recording) and scene == 'game':
+        profiler.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.enabled = not profiler.enabled
+        now = time.perf_counter()
+        frame_dt = now - last
+        last = now
+        if speed > 0:
+            accumulator += min(frame_dt, MAX_SIM_STEPS * SIM_DT) * speed
+            steps = int(accumulator / SIM_DT)
+            accumulator -= steps * SIM_DT
+        else:
+            steps = 1
+        for _ in range(steps):
+            if tick >= len(recording) or scene != 'game':
+                break
+            keys, actions = source.poll(tick)
+            for action in actions:
+                apply_action(action)
+            simulate_tick(keys)
+            tick += 1
+        display.fill(ocean_dark)
+        draw_game_frame(accumulator / SIM_DT if speed > 0 else 1.0, steps)
+        if profiler.enabled:
+            profiler.draw(display, 8, window_res[1] - 24 - profiler.graph_h - 8)
+        pygame.display.flip()
+        profiler.end_frame(frame_counts())
+        frames += 1
+        if speed > 0:
+            clock.tick(SETTINGS.get('fps_limit', 60))
+    elapsed = time.perf_counter() - started
+    return {
+        'seed': recording.seed,
+        'ticks': tick,
+        'frames': frames,
+        'seconds': round(elapsed, 3),
+        'fps': round(frames / elapsed) if elapsed > 0 else 0,
+        'ticks_per_second': round(tick / elapsed) if elapsed > 0 else 0,
+        **game_summary(),
+    }
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=window_title)
+    parser.add_argument('--headless', action='store_true', help='simulate without a window, driven by a bot')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the random module')
+    parser.add_argument('--ticks', type=int, default=SIM_HZ * 60, help='headless: simulation ticks to run')
+    parser.add_argument('--enemy-count', type=int, default=None, help='enemies per wave multiplier')
+    parser.add_argument('--swarm', action='store_true', help='use the numpy swarm enemy backend')
+    parser.add_argument('--swarm-worker', action='store_true', help='swarm backend with its step in a worker process')
+    parser.add_argument('--ai-budget', type=int, default=None, help='most distant-enemy AI updates per tick (0 = no limit)')
+    parser.add_argument('--record', metavar='FILE', help='record the input of each game played to FILE (the last game is kept)')
+    parser.add_argument('--replay', metavar='FILE', help='play back a recording, on screen or with --headless')
+    parser.add_argument('--replay-speed', type=float, default=0.0, help='on-screen replay speed vs real time (0 = as fast as frames render)')
+    parser.add_argument('--check-replay', action='store_true', help='play two bot games in a row and check the second replays to the same end state')
+    parser.add_argument('--load', metavar='FILE', help='resume a saved game (F5 saves, F9 loads quicksave.sav)')
+    parser.add_argument('--startup-report', action='store_true', help='print how long each startup phase took once the first frame is up')
+    args = parser.parse_args()
+    if args.enemy_count is not None:
+        SETTINGS['enemy_count'] = args.enemy_count
+    if args.ai_budget is not None:
+        SETTINGS['ai_budget'] = args.ai_budget
+    if args.swarm or args.swarm_worker:
+        SETTINGS['swarm'] = True
+    if args.swarm_worker:
+        SETTINGS['swarm_worker'] = True
+    if args.check_replay:
+        mismatched = check_replay(args.seed or 0, args.ticks)
+        for line in mismatched:
+            print(f"replay differs from live game, expected {line}")
+        print('replay matches' if not mismatched else 'replay mismatch')
+        sys.exit(1 if mismatched else 0)
+    elif args.replay:
+        # the recording brings its own seed and settings
+        replay = InputRecording.load(args.replay)
+        if args.headless:
+            summary = run_headless(replay.seed, len(replay), ReplaySource(replay), replay.settings)
+        else:
+            summary = run_replay(replay, args.replay_speed)
+        for key, value in summary.items():
+            print(f"{key}: {value}")
+    elif args.headless:
+        summary = run_headless(args.seed or 0, args.ticks)
+        for key, value in summary.items():
+            print(f"{key}: {value}")
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+        if args.load:
+            try:
+                load_snapshot(args.load)
+            except SNAPSHOT_ERRORS as exc:
+                parser.error(f"--load {args.load}: save incompatible ({exc})")
+        run_game(args.startup_report, args.record)
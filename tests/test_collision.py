@@ -0,0 +1,44 @@
+import pytest
+
+import main as game
+
+R = 10
+
+def test_hit_head_on_reports_entry_time():
+    # the segment enters the circle at x = 40, a fifth of the way along
+    assert game.segment_circle_hit(0, 0, 100, 0, 50, 0, R) == pytest.approx(0.4)
+
+def test_start_inside_hits_at_zero():
+    assert game.segment_circle_hit(50, 3, 100, 0, 50, 0, R) == 0.0
+
+def test_zero_length_segment():
+    assert game.segment_circle_hit(0, 0, 0, 0, 50, 0, R) is None
+    assert game.segment_circle_hit(45, 0, 45, 0, 50, 0, R) == 0.0
+
+def test_misses():
+    # passes beside the circle, stops short of it, or moves away from it
+    assert game.segment_circle_hit(0, 20, 100, 20, 50, 0, R) is None
+    assert game.segment_circle_hit(0, 0, 39, 0, 50, 0, R) is None
+    assert game.segment_circle_hit(0, 0, -100, 0, 50, 0, R) is None
+
+def test_grazing_and_end_touch():
+    assert game.segment_circle_hit(0, R, 100, R, 50, 0, R) == pytest.approx(0.5)
+    assert game.segment_circle_hit(0, 0, 40, 0, 50, 0, R) == pytest.approx(1.0)
+
+def test_fast_bullet_cannot_tunnel():
+    # a step far longer than the circle still hits it
+    assert game.segment_circle_hit(0, 0, 10000, 0, 5000, 0, R) == pytest.approx(0.499)
+
+def test_first_hit_is_the_earliest_along_the_path():
+    game.swarm_mode = False
+    near, far = game.Enemy(200, 100, 1.0), game.Enemy(300, 100, 1.0)
+    game.enemies[:] = [far, near]
+    game.enemy_grid.rebuild(game.enemies)
+    game.bullets.clear()
+    handle = game.spawn_bullet(100, 100, (1.0, 0.0))
+    game.bullets.x[0] = 400
+    assert game.bullet_first_hit(game.bullets.row(handle)) is near
+    near.alive = False
+    assert game.bullet_first_hit(game.bullets.row(handle)) is far
+    game.enemies.clear()
+    game.bullets.clear()
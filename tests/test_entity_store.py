@@ -0,0 +1,55 @@
+import pytest
+
+import main as game
+
+def make_store(n):
+    store = game.EntityStore(('x', 'd'), ('name', None))
+    handles = [store.spawn(x=float(i), name=f'e{i}') for i in range(n)]
+    return store, handles
+
+def test_flush_keeps_survivors():
+    store, handles = make_store(10)
+    for i in (0, 3, 4, 9):
+        store.kill(handles[i])
+    store.kill(handles[3])  # killing twice in one pass is harmless
+    store.flush()
+    assert len(store) == 6
+    survivors = [i for i in range(10) if i not in (0, 3, 4, 9)]
+    assert sorted(store.x) == [float(i) for i in survivors]
+    for i in survivors:
+        slot = store.slot_of(handles[i])
+        assert store.x[slot] == float(i)
+        assert store.name[slot] == f'e{i}'
+        assert store.ids[slot] == handles[i]
+
+def test_stale_handle_is_rejected_after_its_id_is_reused():
+    store, handles = make_store(3)
+    store.kill(handles[1])
+    store.flush()
+    reused = store.spawn(x=99.0, name='new')
+    assert reused & game.HANDLE_ID_MASK == handles[1] & game.HANDLE_ID_MASK
+    assert store.slot_of(handles[1]) is None
+    with pytest.raises(KeyError):
+        store.kill(handles[1])
+    with pytest.raises(KeyError):
+        store.row(handles[1])
+    assert store.row(reused).x == 99.0
+
+def test_row_follows_its_entity_across_flushes():
+    store, handles = make_store(5)
+    row = store.row(handles[4])
+    store.kill(handles[0])
+    store.flush()  # the last row moves into slot 0
+    assert row.x == 4.0 and row.name == 'e4'
+    store.kill(handles[4])
+    store.flush()
+    with pytest.raises(KeyError):
+        row.x
+
+def test_clear_invalidates_every_handle():
+    store, handles = make_store(4)
+    store.clear()
+    assert len(store) == 0
+    assert all(store.slot_of(h) is None for h in handles)
+    handle = store.spawn(x=1.0, name='a')
+    assert store.row(handle).x == 1.0
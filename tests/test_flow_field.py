@@ -0,0 +1,61 @@
+import heapq
+import random
+
+import numpy as np
+
+import main as game
+
+COLS, ROWS = 24, 16
+
+def walled_field(seed, density=0.2):
+    rng = np.random.default_rng(seed)
+    field = game.FlowField(COLS, ROWS)
+    blocked = rng.random((COLS, ROWS)) < density
+    # a closed box, so some targets can't reach the rest of the map
+    blocked[2:7, 2] = blocked[2:7, 6] = blocked[2, 2:7] = blocked[6, 2:7] = True
+    field.set_blocked(blocked)
+    return field
+
+def dijkstra(field, target):
+    # reference path costs over the same step table
+    cost = np.full(COLS * ROWS, game.FLOW_UNREACHED, np.int64)
+    cost[target] = 0
+    heap = [(0, target)]
+    while heap:
+        c, tile = heapq.heappop(heap)
+        if c > cost[tile]:
+            continue
+        for k in range(len(field.offsets)):
+            near = field.neighbours[k, tile]
+            through = c + field.step_costs[k]
+            if through < cost[near]:
+                cost[near] = through
+                heapq.heappush(heap, (int(through), int(near)))
+    return cost
+
+def same_field(a, b):
+    return all(np.array_equal(x, y, equal_nan=True) for x, y in zip((a[0], a[1], a[4]), (b[0], b[1], b[4])))
+
+def test_cold_build_matches_dijkstra():
+    field = walled_field(1)
+    for col, row in ((0, 0), (12, 8), (4, 4), (COLS - 1, ROWS - 1)):
+        assert np.array_equal(field.build(col, row)[4], dijkstra(field, col * ROWS + row))
+
+def test_seeded_build_matches_cold_build():
+    field = walled_field(2)
+    rng = random.Random(2)
+    tiles = [(rng.randrange(COLS), rng.randrange(ROWS)) for _ in range(12)] + [(4, 4), (0, 0)]
+    for a, b in zip(tiles, tiles[1:]):
+        seed = field.build(*a)[4]
+        assert same_field(field.build(*b, seed), field.build(*b))
+
+def test_walking_target_matches_cold_fields():
+    # field() seeds every new tile from the previous one, as a moving player does
+    field = walled_field(3, density=0.1)
+    cold = walled_field(3, density=0.1)
+    col, row = 12, 8
+    for step in range(30):
+        col = min(COLS - 1, max(0, col + (step % 3) - 1))
+        row = min(ROWS - 1, max(0, row + (step % 5 == 0) - (step % 7 == 0)))
+        x, y = (col + 0.5) * field.tile, (row + 0.5) * field.tile
+        assert same_field(field.field(x, y)[1], cold.build(col, row))
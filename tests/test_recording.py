@@ -0,0 +1,54 @@
+import struct
+
+import pygame
+import pytest
+
+import main as game
+
+def record_sample():
+    recording = game.InputRecording(11, {'difficulty': 'hard', 'volume': 0.5})
+    recording.record_tick(game.HeldKeys(), (0, 0))
+    for action in (('shoot', 12.5, -3.25), ('reload',), ('shield',), ('pause',), ('spawn', 40000), ('view', 640.0, 360.5)):
+        recording.record_action(action)
+    recording.record_tick(game.HeldKeys([pygame.K_LEFT, pygame.K_w]), (799, -20))
+    recording.record_tick(game.HeldKeys(game.RECORDED_KEYS), (-32768, 32767))
+    return recording
+
+def test_save_load_round_trip(tmp_path):
+    recording = record_sample()
+    path = tmp_path / 'sample.rec'
+    recording.save(path)
+    loaded = game.InputRecording.load(path)
+    assert loaded.seed == recording.seed
+    assert loaded.settings == recording.settings
+    assert loaded.ticks == recording.ticks
+
+def test_every_action_kind_is_covered():
+    kinds = {kind for _, _, actions in record_sample().ticks for kind, *_ in actions}
+    assert kinds == set(game.RECORDED_ACTIONS)
+
+def test_loaded_recording_replays_the_game(tmp_path):
+    recording = game.InputRecording(4, game.SETTINGS)
+    game.run_headless(4, 600, game.RecordingSource(game.ChaseBot(), recording))
+    live = game.game_summary()
+    path = tmp_path / 'bot.rec'
+    recording.save(path)
+    loaded = game.InputRecording.load(path)
+    game.run_headless(loaded.seed, len(loaded), game.ReplaySource(loaded), loaded.settings)
+    assert game.game_summary() == live
+
+def test_rejects_another_version(tmp_path):
+    path = tmp_path / 'sample.rec'
+    record_sample().save(path)
+    data = bytearray(path.read_bytes())
+    data[7] = game.RECORDING_VERSION + 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        game.InputRecording.load(path)
+
+def test_rejects_a_truncated_file(tmp_path):
+    path = tmp_path / 'sample.rec'
+    record_sample().save(path)
+    path.write_bytes(path.read_bytes()[:struct.calcsize('<7sBIII') - 1])
+    with pytest.raises(struct.error):
+        game.InputRecording.load(path)
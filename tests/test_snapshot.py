@@ -0,0 +1,60 @@
+import struct
+import zlib
+
+import pytest
+
+import main as game
+
+def play(bot, start, stop):
+    # drive the game scene with the headless bot for ticks [start, stop)
+    for tick in range(start, stop):
+        if game.scene != 'game':
+            break
+        keys, actions = bot.poll(tick)
+        for action in actions:
+            game.apply_action(action)
+        game.simulate_tick(keys)
+
+def test_restore_reproduces_the_snapshot():
+    game.run_headless(seed=3, ticks=600)
+    data = game.snapshot_state()
+    summary = game.game_summary()
+    game.run_headless(seed=5, ticks=300)
+    game.restore_state(data)
+    assert game.snapshot_state() == data
+    assert game.game_summary() == summary
+
+def test_resumed_game_plays_on_identically():
+    bot = game.ChaseBot()
+    game.start_game(7)
+    play(bot, 0, 400)
+    data = game.snapshot_state()
+    play(bot, 400, 800)
+    expected = game.snapshot_state(), game.game_summary()
+    game.restore_state(data)
+    play(bot, 400, 800)
+    assert (game.snapshot_state(), game.game_summary()) == expected
+
+@pytest.fixture
+def saved():
+    game.run_headless(seed=1, ticks=300)
+    return game.snapshot_state()
+
+def check_rejected(data):
+    game.run_headless(seed=2, ticks=200)
+    before = game.snapshot_state()
+    with pytest.raises(game.SNAPSHOT_ERRORS):
+        game.restore_state(data)
+    assert game.snapshot_state() == before
+
+def test_rejects_another_version(saved):
+    magic, version, size = struct.unpack_from('<7sBI', saved)
+    check_rejected(struct.pack('<7sBI', magic, version - 1, size) + saved[struct.calcsize('<7sBI'):])
+
+def test_rejects_a_truncated_file(saved):
+    check_rejected(saved[:len(saved) // 2])
+
+def test_rejects_a_truncated_body(saved):
+    header = struct.calcsize('<7sBI')
+    body = zlib.decompress(saved[header:])
+    check_rejected(saved[:header] + zlib.compress(body[:-16]))
@@ -0,0 +1,63 @@
+import random
+from types import SimpleNamespace
+
+import main as game
+
+CELL = 60
+
+def scatter(rng, n, lo=-300, hi=1500):
+    return [SimpleNamespace(x=rng.uniform(lo, hi), y=rng.uniform(lo, hi), alive=rng.random() < 0.9) for _ in range(n)]
+
+def within(items, x, y, radius):
+    # brute force: every alive object inside the radius, in list order
+    return [o for o in items if o.alive and (o.x - x) ** 2 + (o.y - y) ** 2 <= radius * radius]
+
+def check_queries(grid, items, rng):
+    for _ in range(200):
+        x, y = rng.uniform(-400, 1600), rng.uniform(-400, 1600)
+        radius = rng.choice((CELL / 2, CELL, CELL * 1.5, CELL * 3))
+        found = grid.query(x, y, radius)
+        assert within(found, x, y, radius) == within(items, x, y, radius)
+        # candidates come back in list order, so results don't depend on bucket layout
+        order = {id(o): i for i, o in enumerate(items)}
+        assert [order[id(o)] for o in found] == sorted(order[id(o)] for o in found)
+
+def test_query_matches_brute_force():
+    rng = random.Random(1)
+    items = scatter(rng, 400)
+    grid = game.SpatialGrid(CELL)
+    grid.rebuild(items)
+    check_queries(grid, items, rng)
+
+def test_query_matches_brute_force_after_moves_and_deaths():
+    rng = random.Random(2)
+    items = scatter(rng, 400)
+    grid = game.SpatialGrid(CELL)
+    grid.rebuild(items)
+    for o in items:
+        if rng.random() < 0.5:
+            o.x += rng.uniform(-2 * CELL, 2 * CELL)
+            o.y += rng.uniform(-2 * CELL, 2 * CELL)
+        if rng.random() < 0.1:
+            o.alive = False
+        grid.update(o)
+    check_queries(grid, items, rng)
+
+def test_points_on_cell_edges():
+    items = [SimpleNamespace(x=float(x), y=float(y), alive=True) for x in (0, CELL, 2 * CELL) for y in (0, -CELL)]
+    grid = game.SpatialGrid(CELL)
+    grid.rebuild(items)
+    for o in items:
+        assert within(grid.query(o.x, o.y, CELL), o.x, o.y, CELL) == within(items, o.x, o.y, CELL)
+
+def test_query_box_covers_everything_inside():
+    rng = random.Random(3)
+    items = scatter(rng, 400)
+    grid = game.SpatialGrid(CELL)
+    grid.rebuild(items)
+    for _ in range(100):
+        x0, y0 = rng.uniform(-400, 1500), rng.uniform(-400, 1500)
+        x1, y1 = x0 + rng.uniform(0, 300), y0 + rng.uniform(0, 300)
+        found = {id(o) for o in grid.query_box(x0, y0, x1, y1)}
+        inside = {id(o) for o in items if o.alive and x0 <= o.x <= x1 and y0 <= o.y <= y1}
+        assert inside <= found